@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import logging
 import proxycheck
 
@@ -7,7 +8,6 @@ from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 from starlette.applications import Starlette
 from starlette.middleware import Middleware
-from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.authentication import AuthenticationMiddleware
 from starlette.middleware.cors import CORSMiddleware
 
@@ -15,21 +15,33 @@ from starlette_prometheus import PrometheusMiddleware
 
 from aiocache import Cache
 from aioauth_client import DiscordClient
-from secrets import token_urlsafe
 
 from OpenQueue import OpenQueue
 from OpenQueue.resources import Sessions as BaseSessions
 from OpenQueue.resources import Config as BaseConfig
-from OpenQueue.key_loader import KeyLoader
 
 from .routes import ROUTES, ERROR_HANDLERS
-from .middleware import AuthenticateMiddleware
-
-from .resources import Sessions, Config
+from .middleware import AuthenticateMiddleware, SessionMiddleware
+
+from .resources import Sessions, Config, Queues
+from .caching import invalidate
+from .local_cache import LocalCache
+from .pubsub import MemoryPubSub, RedisPubSub
+from .feed import MemoryMatchFeed, RedisMatchFeed
+from .broadcast import ScoreboardBroadcaster
+from .token_store import MemoryTokenStore, RedisTokenStore
+from .queue_store import MemoryQueueStore, RedisQueueStore
+from .serializers import BytesSerializer
+from .scopes import ScopeRegistry
+from .proxy_lookup import ProxyLookup, ProxyCheckProvider, StubProxyProvider
+from .ip_ranges import IPRanges
+from .matchmaking import Matchmaker
 
 from .settings.discord import DiscordSettings
 from .settings.proxy_check import ProxyCheckSettings
 from .settings.api import ApiSettings
+from .settings.cache import CacheSettings
+from .settings.matchmaking import MatchmakingSettings
 
 from .login import LoginTokens
 
@@ -51,7 +63,10 @@ class SkrimAPI(Starlette):
                  proxy_check_settings: ProxyCheckSettings,
                  api_settings: ApiSettings,
                  backend_url: str,
-                 frontend_url: str,  **kwargs) -> None:
+                 frontend_url: str,
+                 cache_settings: CacheSettings = None,
+                 matchmaking_settings: MatchmakingSettings = None,
+                 **kwargs) -> None:
         """Nexus League's API.
 
         Parameters
@@ -63,6 +78,10 @@ class SkrimAPI(Starlette):
         proxy_check_settings : ProxyCheckSettings
         backend_url : str
         frontend_url : str
+        cache_settings : CacheSettings, optional
+            by default None
+        matchmaking_settings : MatchmakingSettings, optional
+            by default None
         """
 
         assert isinstance(skrim, OpenQueue)
@@ -72,6 +91,16 @@ class SkrimAPI(Starlette):
         assert isinstance(backend_url, str)
         assert isinstance(frontend_url, str)
 
+        if cache_settings is None:
+            cache_settings = CacheSettings()
+        else:
+            assert isinstance(cache_settings, CacheSettings)
+
+        if matchmaking_settings is None:
+            matchmaking_settings = MatchmakingSettings()
+        else:
+            assert isinstance(matchmaking_settings, MatchmakingSettings)
+
         Sessions.base = skrim
 
         Config.proxy = proxy_check_settings
@@ -86,21 +115,20 @@ class SkrimAPI(Starlette):
         Config.b2 = BaseConfig.b2
         Config.pfp = BaseConfig.pfp
         Config.webhooks = BaseConfig.webhooks
-
-        session_key = KeyLoader("session").load()
-        if not session_key:
-            session_key = KeyLoader("session").save(token_urlsafe(24))
+        Config.cache = cache_settings
+        Config.matchmaking = matchmaking_settings
 
         middlewares = [
-            Middleware(
-                SessionMiddleware,
-                secret_key=session_key
-            ),
+            Middleware(SessionMiddleware),
             Middleware(
                 AuthenticationMiddleware,
                 backend=AuthenticateMiddleware()
             ),
-            Middleware(CORSMiddleware, allow_origins=["*"]),
+            Middleware(
+                CORSMiddleware,
+                allow_origins=["*"],
+                expose_headers=["ETag"]
+            ),
             Middleware(ProxyHeadersMiddleware, trusted_hosts="*"),
             Middleware(PrometheusMiddleware)
         ]
@@ -137,24 +165,79 @@ class SkrimAPI(Starlette):
         """
 
         try:
-            Sessions.cache = Cache(Cache.REDIS)
+            Sessions.cache = Cache(Cache.REDIS, serializer=BytesSerializer())
             await Sessions.cache.exists("connection")
+            Sessions.pubsub = RedisPubSub(Sessions.cache)
+            Sessions.match_feed = RedisMatchFeed(
+                Sessions.cache, Config.cache.match_feed_size
+            )
+            Sessions.login_token = LoginTokens(
+                RedisTokenStore(Sessions.cache)
+            )
+            Queues.active = RedisQueueStore(Sessions.cache)
         except ConnectionRefusedError:
-            Sessions.cache = Cache(Cache.MEMORY)
+            Sessions.cache = Cache(Cache.MEMORY, serializer=BytesSerializer())
+            Sessions.pubsub = MemoryPubSub()
+            Sessions.match_feed = MemoryMatchFeed(
+                Config.cache.match_feed_size
+            )
+            Sessions.login_token = LoginTokens(
+                MemoryTokenStore(Config.cache.token_store_size)
+            )
+            Queues.active = MemoryQueueStore()
             logger.warning(
                 "Memory cache being used, use redis for production."
             )
 
+        Sessions.local_caches = {
+            name: LocalCache(settings.max_size, settings.ttl)
+            for name, settings in Config.cache.local.items()
+        }
+        await Sessions.pubsub.subscribe(
+            Config.cache.invalidate_channel, invalidate
+        )
+
+        Sessions.scoreboards = ScoreboardBroadcaster(
+            Sessions.pubsub, Config.cache.scoreboard_channel
+        )
+        await Sessions.scoreboards.start()
+
         await Sessions.base.startup()
 
         Sessions.requests = BaseSessions.requests
         Sessions.database = BaseSessions.database
 
+        Sessions.scopes = ScopeRegistry(Sessions.database)
+        await Sessions.scopes.load()
+        self.scopes_poll = asyncio.create_task(
+            Sessions.scopes.poll(Config.api.scopes_reload)
+        )
+
+        if Config.matchmaking.maps:
+            self.matchmaking = asyncio.create_task(
+                Matchmaker(Queues.active, Config.matchmaking).run()
+            )
+        else:
+            self.matchmaking = None
+
         Sessions.proxy = proxycheck.Awaiting(
             Config.proxy.key
         )
 
-        Sessions.login_token = LoginTokens()
+        if Config.proxy.stub:
+            provider = StubProxyProvider()
+        else:
+            provider = ProxyCheckProvider(Sessions.proxy)
+
+        Sessions.proxy_lookup = ProxyLookup(
+            provider,
+            Config.proxy.cache_size,
+            Config.proxy.cache_ttl,
+            Config.proxy.batch_size,
+            Config.proxy.batch_wait,
+            IPRanges(Config.proxy.ip_ranges) if Config.proxy.ip_ranges
+            else None
+        )
 
         Sessions.discord_auth = DiscordClient(
             Config.discord.client_id,
@@ -165,6 +248,14 @@ class SkrimAPI(Starlette):
         """Called after server shutdown.
         """
 
+        self.scopes_poll.cancel()
+        if self.matchmaking:
+            self.matchmaking.cancel()
+
+        await Sessions.pubsub.close()
         await Sessions.cache.close()
         await Sessions.base.shutdown()
         await Sessions.proxy.close()
+
+        if Sessions.proxy_lookup.ranges:
+            Sessions.proxy_lookup.ranges.close()
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Union
 from sqlalchemy.sql import select, and_, or_
 from starlette.authentication import AuthenticationError
 
@@ -16,8 +16,25 @@ from .tables import (
 )
 
 
-async def api_key(key: str
-                  ) -> Tuple[League, str, Dict[str, bool]]:
+API_KEY_LENGTH = api_key_table.c.api_key.type.length
+
+
+def valid_api_key(key: str) -> bool:
+    """Used to reject keys which can't exist without any I/O.
+
+    Parameters
+    ----------
+    key : str
+
+    Returns
+    -------
+    bool
+    """
+
+    return 0 < len(key) <= API_KEY_LENGTH
+
+
+async def api_key(key: str) -> Tuple[League, str, int, int]:
     """Used to validate & get details on api key.
 
     Parameters
@@ -30,11 +47,10 @@ async def api_key(key: str
         League object.
     str
         User ID.
-    Dict[str, bool]
-        str
-            Scope
-        bool
-            If public scope
+    int
+        Mask of granted scope IDs.
+    int
+        Mask of scope IDs using the public schema.
 
     Raises
     ------
@@ -45,7 +61,7 @@ async def api_key(key: str
         api_key_table.c.league_id,
         api_key_table.c.user_id,
         key_scopes_table.c.public_schema,
-        scopes_table.c.scope
+        key_scopes_table.c.scope_id
     ]).select_from(
         api_key_table.join(
             league_table,
@@ -53,9 +69,6 @@ async def api_key(key: str
         ).join(
             key_scopes_table,
             key_scopes_table.c.api_key == api_key_table.c.api_key
-        ).join(
-            scopes_table,
-            scopes_table.c.scope_id == key_scopes_table.c.scope_id
         )
     ).where(
         and_(
@@ -67,7 +80,8 @@ async def api_key(key: str
         )
     )
 
-    scopes = {}
+    granted = 0
+    public = 0
 
     league_id: str = ""
     user_id: str = ""
@@ -75,17 +89,38 @@ async def api_key(key: str
     async for row in Sessions.database.iterate(query):
         league_id = row["league_id"]
         user_id = row["user_id"]
-        scopes[row["scope"]] = row["public_schema"]
 
-    if league_id:
-        if "league" not in scopes:
-            scopes["league"] = True
+        granted |= 1 << row["scope_id"]
+        if row["public_schema"]:
+            public |= 1 << row["scope_id"]
 
-        return Sessions.base.league(league_id), user_id, scopes
+    if league_id:
+        return Sessions.base.league(league_id), user_id, granted, public
     else:
         raise AuthenticationError()
 
 
+async def cached_api_key(key: str
+                         ) -> Union[Tuple[League, str, int, int], bool]:
+    """Used to get api key details, invalid keys are
+    cached as False.
+
+    Parameters
+    ----------
+    key : str
+
+    Returns
+    -------
+    Union[Tuple[League, str, int, int], bool]
+        False if invalid.
+    """
+
+    try:
+        return await api_key(key)
+    except AuthenticationError:
+        return False
+
+
 async def admin_scopes(user_id: str, league_id: str) -> Dict[str, bool]:
     """Used to get admin scopes.
 
@@ -122,3 +157,22 @@ async def admin_scopes(user_id: str, league_id: str) -> Dict[str, bool]:
         scopes["is_admin"] = True
 
     return scopes
+
+
+async def cached_admin_scopes(league_id: str, user_id: str
+                              ) -> Union[Dict[str, bool], bool]:
+    """Used to get admin scopes, users who aren't
+    admins are cached as False.
+
+    Parameters
+    ----------
+    league_id : str
+    user_id : str
+
+    Returns
+    -------
+    Union[Dict[str, bool], bool]
+        False if not a admin.
+    """
+
+    return await admin_scopes(user_id, league_id) or False
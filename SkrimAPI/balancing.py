@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+Splits a pool of rated players into lobbies & balances the
+teams of every lobby at once over arrays.
+"""
+
+import numpy as np
+
+from typing import Tuple
+
+
+# Most swaps tried per lobby when refining.
+MAX_SWAPS = 16
+
+
+def snake_order(lobby_size: int) -> np.ndarray:
+    """Used to get which team each pick goes to,
+    a snake draft picks 1, 2, 2, 1, 1, 2...
+
+    Parameters
+    ----------
+    lobby_size : int
+
+    Returns
+    -------
+    np.ndarray
+        0 for team 1, 1 for team 2.
+    """
+
+    return ((np.arange(lobby_size) + 1) // 2) % 2
+
+
+def balance(ratings: np.ndarray, team_size: int, max_swaps: int = MAX_SWAPS
+            ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Used to split players into balanced lobbies.
+
+    Parameters
+    ----------
+    ratings : np.ndarray
+        Rating of each player.
+    team_size : int
+    max_swaps : int, optional
+        by default MAX_SWAPS
+
+    Returns
+    -------
+    np.ndarray
+        Team 1 player indexes, shape (lobbies, team_size).
+    np.ndarray
+        Team 2 player indexes, shape (lobbies, team_size).
+    np.ndarray
+        Average rating difference between teams per lobby.
+    np.ndarray
+        Indexes of players left over.
+
+    Notes
+    -----
+    Players are sorted by rating & grouped into lobbies of
+    similar ratings, the lowest rated left over wait. Teams
+    are snake drafted, then each round every lobby makes
+    the one swap between teams which closes its rating
+    gap the most, till no swap helps.
+    """
+
+    ratings = np.asarray(ratings, dtype=np.float64)
+    lobby_size = team_size * 2
+    lobbies = len(ratings) // lobby_size
+
+    order = np.argsort(-ratings, kind="stable")
+    grouped = order[:lobbies * lobby_size].reshape(lobbies, lobby_size)
+
+    picks = snake_order(lobby_size)
+    team_1 = grouped[:, picks == 0]
+    team_2 = grouped[:, picks == 1]
+
+    rows = np.arange(lobbies)
+
+    for _ in range(max_swaps):
+        ratings_1 = ratings[team_1]
+        ratings_2 = ratings[team_2]
+        gap = ratings_1.sum(axis=1) - ratings_2.sum(axis=1)
+
+        # Gap after swapping team 1's i with team 2's j.
+        swapped = np.abs(
+            gap[:, None, None]
+            - 2 * (ratings_1[:, :, None] - ratings_2[:, None, :])
+        ).reshape(lobbies, team_size * team_size)
+
+        best = swapped.argmin(axis=1)
+        improves = swapped[rows, best] < np.abs(gap)
+        if not improves.any():
+            break
+
+        lobby = rows[improves]
+        i, j = np.divmod(best[improves], team_size)
+
+        player_1 = team_1[lobby, i]
+        team_1[lobby, i] = team_2[lobby, j]
+        team_2[lobby, j] = player_1
+
+    difference = np.abs(
+        ratings[team_1].sum(axis=1) - ratings[team_2].sum(axis=1)
+    ) / team_size
+
+    return team_1, team_2, difference, order[lobbies * lobby_size:]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+from typing import AsyncIterator, Dict, Set, Tuple, Union
+
+from .pubsub import PubSubBase
+from .encoders import json_dumps
+
+
+# Events held for a slow subscriber before its oldest are dropped.
+SUBSCRIBER_BACKLOG = 16
+
+# Event as JSON text for websockets & as a SSE frame.
+Event = Tuple[str, bytes]
+
+
+class ScoreboardBroadcaster:
+    def __init__(self, pubsub: PubSubBase, channel: str) -> None:
+        """Sends scoreboards to clients subscribed to a league or match.
+
+        Parameters
+        ----------
+        pubsub : PubSubBase
+            Scoreboards reach every worker through it.
+        channel : str
+
+        Notes
+        -----
+        Each scoreboard is encoded once when published & framed
+        once per worker, every subscriber is given the same event.
+        """
+
+        self.pubsub = pubsub
+        self.channel = channel
+
+        # (league ID, match ID), match ID is None for a whole league.
+        self.subscribers: Dict[
+            Tuple[str, Union[str, None]], Set[asyncio.Queue]
+        ] = {}
+
+    async def start(self) -> None:
+        await self.pubsub.subscribe(self.channel, self._receive)
+
+    async def publish(self, league_id: str, match_id: str,
+                      scoreboard: dict) -> None:
+        """Used to send a scoreboard to subscribers on every worker.
+
+        Parameters
+        ----------
+        league_id : str
+        match_id : str
+        scoreboard : dict
+        """
+
+        await self.pubsub.publish(self.channel, "{} {} {}".format(
+            league_id, match_id, json_dumps(scoreboard).decode()
+        ))
+
+    def _receive(self, message: str) -> None:
+        league_id, match_id, data = message.split(" ", 2)
+
+        queues = (self.subscribers.get((league_id, match_id), set())
+                  | self.subscribers.get((league_id, None), set()))
+        if not queues:
+            return
+
+        event = (data, b"event: scoreboard\ndata: " + data.encode() + b"\n\n")
+
+        for queue in queues:
+            if queue.full():
+                # Scoreboards are whole, so older ones can be skipped.
+                queue.get_nowait()
+
+            queue.put_nowait(event)
+
+    async def subscribe(self, league_id: str, match_id: str = None,
+                        heartbeat: float = None
+                        ) -> AsyncIterator[Union[Event, None]]:
+        """Used to get scoreboards as they're published.
+
+        Parameters
+        ----------
+        league_id : str
+        match_id : str, optional
+            Every match in the league if not given, by default None
+        heartbeat : float, optional
+            Seconds without a event before None is
+            yielded, by default None
+
+        Yields
+        ------
+        Union[Event, None]
+        """
+
+        key = (league_id, match_id)
+        queue = asyncio.Queue(SUBSCRIBER_BACKLOG)
+
+        self.subscribers.setdefault(key, set()).add(queue)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    event = None
+
+                yield event
+        finally:
+            self.subscribers[key].discard(queue)
+            if not self.subscribers[key]:
+                del self.subscribers[key]
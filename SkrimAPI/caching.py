@@ -6,11 +6,75 @@ Global data is only used by us, so wont
 be under the same amount of stress.
 """
 
-from typing import Any
-from .resources import Sessions
+import asyncio
+import logging
+import struct
+
+from secrets import token_hex
+from time import time, time_ns
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Union
+
+from .local_cache import LocalCache
+from .metrics import (
+    CACHE_HITS,
+    CACHE_MISSES,
+    CACHE_GET_SECONDS,
+    CACHE_SET_SECONDS,
+    CACHE_VALUE_BYTES,
+    CACHE_LOADS,
+    CACHE_DEDUPLICATED,
+    CACHE_STALE_SERVES,
+    CACHE_REFRESHES
+)
+from .resources import Config, Sessions
+from .serializers import (
+    CodecBase,
+    MsgpackCodec,
+    APIKeyCodec,
+    ResponseCodec,
+    RevisionedResponseCodec
+)
+
+
+logger = logging.getLogger("SkrimAPI")
+
+# Used to ignore our own invalidation messages.
+WORKER_ID = token_hex(8)
+
+# Stored before the codec's bytes, frame version &
+# unix time the value is fresh until.
+FRAME = struct.Struct("!Bd")
+FRAME_VERSION = 1
+
+
+def invalidate(message: str) -> None:
+    """Used to drop local entries another worker changed.
+
+    Parameters
+    ----------
+    message : str
+        Worker ID, cache class name & key.
+    """
+
+    worker_id, name, key = message.split(" ", 2)
+    if worker_id != WORKER_ID and name in Sessions.local_caches:
+        Sessions.local_caches[name].delete(key)
 
 
 class CacheBase:
+    # In-flight loads, shared by every cache class.
+    loading: Dict[str, asyncio.Future] = {}
+
+    # Hard TTL, after which the value is gone.
+    ttl = 180
+    # Soft TTL, after which reads given a loader get the stale
+    # value & refresh it in the background. None to disable.
+    soft_ttl: int = None
+    # TTL for False, which marks something known not to exist.
+    negative_ttl = 30
+
+    codec: CodecBase = MsgpackCodec()
+
     def __init__(self, key: str) -> None:
         """Used to cache something.
 
@@ -21,35 +85,560 @@ class CacheBase:
 
         self.key = key
 
+    @property
+    def local(self) -> Union[LocalCache, None]:
+        return Sessions.local_caches.get(self.__class__.__name__)
+
+    @property
+    def _labels(self) -> Tuple[str, str]:
+        return self.__class__.__name__, Sessions.cache.NAME
+
+    async def _invalidate(self) -> None:
+        if self.local:
+            await Sessions.pubsub.publish(
+                Config.cache.invalidate_channel,
+                " ".join((WORKER_ID, self.__class__.__name__, self.key))
+            )
+
     async def delete(self) -> None:
+        if self.local:
+            self.local.delete(self.key)
+
         await Sessions.cache.delete(self.key)
+        await self._invalidate()
+
+    async def set(self, value: Any, ttl: int = None) -> None:
+        if value is False:
+            fresh_for = ttl = ttl or self.negative_ttl
+        else:
+            ttl = ttl or self.ttl
+            fresh_for = self.soft_ttl or ttl
+
+        frame = FRAME.pack(
+            FRAME_VERSION, time() + fresh_for
+        ) + self.codec.encode(value)
+
+        if self.local:
+            self.local.set(self.key, frame, ttl)
+
+        labels = self._labels
+        CACHE_VALUE_BYTES.labels(*labels).observe(len(frame))
+
+        with CACHE_SET_SECONDS.labels(*labels).time():
+            await Sessions.cache.set(self.key, frame, ttl=ttl)
 
-    async def set(self, value: Any, ttl=180) -> None:
-        await Sessions.cache.set(self.key, value, ttl=ttl)
+        await self._invalidate()
 
-    async def get(self) -> Any:
-        return await Sessions.cache.get(self.key)
+    async def get_raw(self, loader: Callable[[], Awaitable[Any]] = None
+                      ) -> Union[bytes, None]:
+        """Used to get the stored bytes.
+
+        Parameters
+        ----------
+        loader : Callable[[], Awaitable[Any]], optional
+            Used to refresh stale values, by default None
+
+        Returns
+        -------
+        Union[bytes, None]
+        """
+
+        frame, tier = await self._get_frame()
+        return self._unframe(frame, loader, tier)
+
+    async def _get_frame(self) -> Tuple[Union[bytes, None], str]:
+        local = self.local
+        frame = local.get(self.key) if local else None
+        if frame is None:
+            with CACHE_GET_SECONDS.labels(*self._labels).time():
+                frame = await Sessions.cache.get(self.key)
+
+            return frame, "shared"
+
+        return frame, "local"
+
+    async def get_expiring(self) -> Tuple[Any, float]:
+        """Used to get a value & when it stops being fresh.
+
+        Returns
+        -------
+        Any
+            None if not stored.
+        float
+            Unix time, when it expires for caches without a soft TTL.
+        """
+
+        frame, tier = await self._get_frame()
+
+        raw = self._unframe(frame, None, tier)
+        if raw is None:
+            return None, 0.0
+
+        return self.codec.decode(raw), FRAME.unpack_from(frame)[1]
+
+    @staticmethod
+    async def get_raw_many(caches: List["CacheBase"],
+                           loaders: List[Callable[[], Awaitable[Any]]] = None
+                           ) -> List[Union[bytes, None]]:
+        """Used to get the stored bytes of many caches, entries
+        not held locally are read in one request.
+
+        Parameters
+        ----------
+        caches : List[CacheBase]
+        loaders : List[Callable[[], Awaitable[Any]]], optional
+            Used to refresh stale values, by default None
+
+        Returns
+        -------
+        List[Union[bytes, None]]
+            In the order given.
+        """
+
+        if loaders is None:
+            loaders = [None] * len(caches)
+
+        frames = [
+            cache.local.get(cache.key) if cache.local else None
+            for cache in caches
+        ]
+        missing = [
+            index for index, frame in enumerate(frames) if frame is None
+        ]
+
+        values = [
+            caches[index]._unframe(frames[index], loaders[index], "local")
+            if frames[index] is not None else None
+            for index in range(len(caches))
+        ]
+
+        if missing:
+            with CACHE_GET_SECONDS.labels(*caches[0]._labels).time():
+                fetched = await Sessions.cache.multi_get(
+                    [caches[index].key for index in missing]
+                )
+
+            for index, frame in zip(missing, fetched):
+                values[index] = caches[index]._unframe(
+                    frame, loaders[index], "shared"
+                )
+
+        return values
+
+    def _unframe(self, frame: Union[bytes, None],
+                 loader: Union[Callable[[], Awaitable[Any]], None],
+                 tier: str) -> Union[bytes, None]:
+        labels = self._labels
+
+        if frame is None:
+            CACHE_MISSES.labels(*labels).inc()
+            return None
+
+        CACHE_HITS.labels(*labels, tier).inc()
+
+        if tier == "shared" and self.local:
+            self.local.set(self.key, frame, self.local.ttl)
+
+        if len(frame) < FRAME.size:
+            return None
+
+        version, fresh_until = FRAME.unpack_from(frame)
+        if version != FRAME_VERSION:
+            return None
+
+        if loader and fresh_until < time():
+            CACHE_STALE_SERVES.labels(labels[0]).inc()
+            self.refresh(loader)
+
+        return frame[FRAME.size:]
+
+    async def get(self, loader: Callable[[], Awaitable[Any]] = None) -> Any:
+        raw = await self.get_raw(loader)
+        if raw is None:
+            return None
+
+        return self.codec.decode(raw)
+
+    def _start_load(self, loader: Callable[[], Awaitable[Any]],
+                    ttl: int) -> asyncio.Future:
+        CacheBase.loading[self.key] = asyncio.ensure_future(
+            self._load(loader, ttl)
+        )
+        CacheBase.loading[self.key].add_done_callback(
+            lambda _: CacheBase.loading.pop(self.key, None)
+        )
+
+        return CacheBase.loading[self.key]
+
+    async def load(self, loader: Callable[[], Awaitable[Any]],
+                   ttl: int = None) -> Any:
+        """Used to load & cache a value after a miss.
+
+        Parameters
+        ----------
+        loader : Callable[[], Awaitable[Any]]
+        ttl : int, optional
+            by default None
+
+        Returns
+        -------
+        Any
+
+        Notes
+        -----
+        Concurrent loads for the same key share the first
+        caller's loader.
+        """
+
+        if self.key in CacheBase.loading:
+            CACHE_DEDUPLICATED.labels(self.__class__.__name__).inc()
+        else:
+            CACHE_LOADS.labels(self.__class__.__name__).inc()
+            self._start_load(loader, ttl)
+
+        # Shielded so a cancelled request doesn't cancel
+        # the load for everyone else waiting on it.
+        return await asyncio.shield(CacheBase.loading[self.key])
+
+    def refresh(self, loader: Callable[[], Awaitable[Any]],
+                ttl: int = None) -> None:
+        """Used to reload & cache a value in the background.
+
+        Parameters
+        ----------
+        loader : Callable[[], Awaitable[Any]]
+        ttl : int, optional
+            by default None
+        """
+
+        if self.key in CacheBase.loading:
+            return
+
+        CACHE_REFRESHES.labels(self.__class__.__name__).inc()
+        self._start_load(loader, ttl).add_done_callback(self._refreshed)
+
+    def _refreshed(self, task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception():
+            logger.warning(
+                "Refreshing {} failed".format(self.key),
+                exc_info=task.exception()
+            )
+
+    async def _load(self, loader: Callable[[], Awaitable[Any]],
+                    ttl: int) -> Any:
+        value = await loader()
+        await self.set(value, ttl)
+        return value
 
     async def exists(self) -> bool:
         return await Sessions.cache.exists()
 
 
-class CacheMatch(CacheBase):
+class CacheResponse(CacheBase):
+    """Used to cache data sent as a response.
+    """
+
+    codec = ResponseCodec()
+
+    soft_ttl = 60
+
+    async def get_response(self, loader: Callable[[], Awaitable[Any]] = None
+                           ) -> Union[Tuple[str, bytes], None]:
+        """Used to get the ETag & encoded response body.
+
+        Parameters
+        ----------
+        loader : Callable[[], Awaitable[Any]], optional
+            Used to refresh stale values, by default None
+
+        Returns
+        -------
+        Union[Tuple[str, bytes], None]
+        """
+
+        raw = await self.get_raw(loader)
+        if raw is None:
+            return None
+
+        return self.codec.response(raw)
+
+    async def load_response(self, loader: Callable[[], Awaitable[Any]]
+                            ) -> Tuple[str, bytes]:
+        """Used to load & cache a value after a miss, then get
+        the ETag & encoded response body as stored.
+
+        Parameters
+        ----------
+        loader : Callable[[], Awaitable[Any]]
+
+        Returns
+        -------
+        Tuple[str, bytes]
+        """
+
+        value = await self.load(loader)
+
+        cached = await self.get_response()
+        if cached is None:
+            # Deleted or replaced by another codec since.
+            cached = self.codec.response(self.codec.encode(value))
+
+        return cached
+
+    @staticmethod
+    async def get_responses(caches: List["CacheResponse"],
+                            loaders: List[Callable[[], Awaitable[Any]]] = None
+                            ) -> List[Union[Tuple[str, bytes], None]]:
+        """Used to get the ETags & encoded response bodies of many caches.
+
+        Parameters
+        ----------
+        caches : List[CacheResponse]
+        loaders : List[Callable[[], Awaitable[Any]]], optional
+            Used to refresh stale values, by default None
+
+        Returns
+        -------
+        List[Union[Tuple[str, bytes], None]]
+            In the order given.
+        """
+
+        return [
+            cache.codec.response(raw) if raw is not None else None
+            for cache, raw in zip(
+                caches, await CacheBase.get_raw_many(caches, loaders)
+            )
+        ]
+
+
+class CacheRevisionedResponse(CacheResponse):
+    """Used to cache a response changed by compare & swap,
+    the ETag is a revision which only goes up.
+
+    Notes
+    -----
+    Every write is conditional on the stored revision, so a
+    load which read the database before a swap can't replace
+    the swapped value.
+    """
+
+    codec = RevisionedResponseCodec()
+
+    # KEYS: key
+    # ARGV: codec version & revision expected, empty if none
+    #       should be stored, frame, ttl, first & last byte
+    #       of the codec version & revision
+    SWAP_SCRIPT = """
+        local stored = redis.call('GET', KEYS[1])
+        if ARGV[1] == '' then
+            if stored then
+                return 0
+            end
+        else
+            if not stored then
+                return 0
+            end
+            local revision = string.sub(
+                stored, tonumber(ARGV[4]), tonumber(ARGV[5])
+            )
+            if revision ~= ARGV[1] then
+                return 0
+            end
+        end
+        redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+        return 1
+    """
+
+    # KEYS: key
+    # ARGV: codec version & revision, frame, ttl,
+    #       first & last byte of the codec version & revision
+    NEWER_SCRIPT = """
+        local stored = redis.call('GET', KEYS[1])
+        if stored then
+            local revision = string.sub(
+                stored, tonumber(ARGV[4]), tonumber(ARGV[5])
+            )
+            if #revision == #ARGV[1] then
+                for index = 1, #revision do
+                    local old = string.byte(revision, index)
+                    local new = string.byte(ARGV[1], index)
+                    if old > new then
+                        return 0
+                    elseif old < new then
+                        break
+                    elseif index == #revision then
+                        return 0
+                    end
+                end
+            end
+        end
+        redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+        return 1
+    """
+
+    def _revision(self, revision: int) -> bytes:
+        return bytes((self.codec.version,)) + revision.to_bytes(
+            self.codec.ETAG_SIZE, "big"
+        )
+
+    def _next_revision(self, stored: Union[bytes, None]) -> int:
+        # Time based, so revisions still go up after a entry expires.
+        revision = time_ns() // 1000
+
+        if stored and stored[0] == self.codec.version:
+            revision = max(revision, int.from_bytes(stored[1:], "big") + 1)
+
+        return revision
+
+    async def _store(self, script: str, revision: bytes, value: Any,
+                     new_revision: int,
+                     check: Callable[[Union[bytes, None]], bool],
+                     ttl: int = None) -> bool:
+        ttl = ttl or self.ttl
+
+        frame = FRAME.pack(
+            FRAME_VERSION, time() + (self.soft_ttl or ttl)
+        ) + self.codec.encode_revision(value, new_revision)
+
+        labels = self._labels
+        CACHE_VALUE_BYTES.labels(*labels).observe(len(frame))
+
+        # Codec version & revision.
+        size = 1 + self.codec.ETAG_SIZE
+
+        with CACHE_SET_SECONDS.labels(*labels).time():
+            if Sessions.cache.NAME == "redis":
+                stored = bool(await Sessions.cache.raw(
+                    "eval", script, [self.key],
+                    [revision, frame, ttl, FRAME.size + 1,
+                     FRAME.size + size]
+                ))
+            else:
+                current = await Sessions.cache.get(self.key)
+                stored = check(
+                    None if current is None
+                    else current[FRAME.size:FRAME.size + size]
+                )
+                if stored:
+                    await Sessions.cache.set(self.key, frame, ttl=ttl)
+
+        if not stored:
+            if self.local:
+                self.local.delete(self.key)
+
+            return False
+
+        if self.local:
+            self.local.set(self.key, frame, ttl)
+
+        await self._invalidate()
+
+        return True
+
+    async def _swap(self, value: Any, expected: Union[bytes, None],
+                    ttl: int = None) -> Union[int, None]:
+        revision = self._next_revision(expected)
+
+        if not await self._store(
+                self.SWAP_SCRIPT, expected or b"", value, revision,
+                lambda stored: stored == expected, ttl):
+            return None
+
+        return revision
+
+    async def swap(self, value: Any, etag: str) -> Union[str, None]:
+        """Used to store a value only if the stored ETag is still etag.
+
+        Parameters
+        ----------
+        value : Any
+        etag : str
+            ETag of the value this one was made from.
+
+        Returns
+        -------
+        Union[str, None]
+            New ETag, None if the stored ETag changed or expired.
+
+        Notes
+        -----
+        Compared & stored in one script on redis, so workers
+        can't overwrite each other's changes. The memory cache
+        only serves one worker, callers keep swaps there in order.
+        """
+
+        revision = self.codec.revision(etag)
+        if revision is None:
+            return None
+
+        revision = await self._swap(value, self._revision(revision))
+        if revision is None:
+            return None
+
+        return self.codec.etag(revision)
+
+    async def set_newer(self, value: Any, revision: int,
+                        ttl: int = None) -> Union[str, None]:
+        """Used to store a value unless the stored one is as new.
+
+        Parameters
+        ----------
+        value : Any
+        revision : int
+            Unix time in microseconds the value is from.
+        ttl : int, optional
+            by default None
+
+        Returns
+        -------
+        Union[str, None]
+            New ETag, None if the stored revision is the same or newer.
+        """
+
+        newer = self._revision(revision)
+
+        if not await self._store(
+                self.NEWER_SCRIPT, newer, value, revision,
+                lambda stored: stored is None or stored < newer, ttl):
+            return None
+
+        return self.codec.etag(revision)
+
+    async def set(self, value: Any, ttl: int = None) -> None:
+        await self.set_newer(value, time_ns() // 1000, ttl)
+
+    async def _load(self, loader: Callable[[], Awaitable[Any]],
+                    ttl: int) -> Any:
+        stored = await Sessions.cache.get(self.key)
+
+        expected = None
+        if stored is not None and len(stored) > FRAME.size:
+            version, fresh_until = FRAME.unpack_from(stored)
+            # Swapped or loaded since this load was started.
+            if version == FRAME_VERSION and fresh_until >= time():
+                value = self.codec.decode(stored[FRAME.size:])
+                if value is not None:
+                    return value
+
+            expected = stored[FRAME.size:FRAME.size + 1 + self.codec.ETAG_SIZE]
+
+        value = await loader()
+        # Only stored if nothing changed it while loading.
+        await self._swap(value, expected, ttl)
+        return value
+
+
+class CacheMatch(CacheResponse):
     def __init__(self, league_id: str, match_id: str) -> None:
         super().__init__("league-" + league_id + "-match-" + match_id)
 
 
-class CacheScoreboard(CacheBase):
+class CacheScoreboard(CacheRevisionedResponse):
     def __init__(self, league_id: str, match_id: str) -> None:
         super().__init__("league-" + league_id + "-scoreboard-" + match_id)
 
 
-class CacheMatches(CacheBase):
-    def __init__(self, league_id: str) -> None:
-        super().__init__("league-" + league_id + "-matches")
-
-
-class CacheUser(CacheBase):
+class CacheUser(CacheResponse):
     def __init__(self, league_id: str, user_id: str) -> None:
         super().__init__(
             "league-" + league_id + "-user-" + user_id,
@@ -57,5 +646,33 @@ class CacheUser(CacheBase):
 
 
 class CacheAPIKey(CacheBase):
+    codec = APIKeyCodec()
+    soft_ttl = 60
+
     def __init__(self, api_key: str) -> None:
         super().__init__("api-key-" + api_key)
+
+
+class CacheAdminScopes(CacheBase):
+    """Admin scopes of a user in a league, False if not a admin.
+
+    Notes
+    -----
+    Whatever changes admin rows should delete the entry.
+    """
+
+    soft_ttl = 60
+
+    def __init__(self, league_id: str, user_id: str) -> None:
+        super().__init__("league-" + league_id + "-admin-" + user_id)
+
+
+class CacheSession(CacheBase):
+    """Site session payload, keyed by the session cookie's ID.
+    """
+
+    # Same as the session cookie's max age.
+    ttl = 14 * 24 * 60 * 60
+
+    def __init__(self, session_id: str) -> None:
+        super().__init__("session-" + session_id)
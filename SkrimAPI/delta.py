@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+"""
+Applies scoreboard updates which only hold what changed.
+"""
+
+from typing import Dict, Iterable, Tuple
+
+
+# Fields of the scoreboard itself, the rest are per player.
+SCOREBOARD_FIELDS = ("team_1_score", "team_2_score", "team_1_side",
+                     "team_2_side", "team_1_name", "team_2_name")
+
+
+class IncompletePlayer(ValueError):
+    """A player not on the scoreboard was given without every field.
+    """
+
+    def __init__(self, user_id: str) -> None:
+        self.user_id = user_id
+
+        super().__init__(user_id)
+
+
+def apply_delta(scoreboard: dict, delta: dict,
+                player_fields: Iterable[str]) -> Tuple[dict, dict]:
+    """Used to apply a delta to a scoreboard.
+
+    Parameters
+    ----------
+    scoreboard : dict
+        Isn't changed.
+    delta : dict
+        Changed scoreboard fields & players, players
+        only need user_id & fields which changed.
+    player_fields : Iterable[str]
+        Every field a player has.
+
+    Returns
+    -------
+    dict
+        Scoreboard with the delta applied.
+    dict
+        Scoreboard fields which changed & players, as whole
+        rows, which changed. Empty if nothing changed.
+
+    Raises
+    ------
+    IncompletePlayer
+    """
+
+    merged = dict(scoreboard)
+    changes = {}
+
+    for field in SCOREBOARD_FIELDS:
+        if field in delta and delta[field] != scoreboard.get(field):
+            merged[field] = changes[field] = delta[field]
+
+    if not delta.get("players"):
+        return merged, changes
+
+    players: Dict[str, dict] = {
+        player["user_id"]: player
+        for player in scoreboard.get("players") or []
+    }
+    changed_players = {}
+
+    for player_delta in delta["players"]:
+        user_id = player_delta["user_id"]
+
+        if user_id in players:
+            player = players[user_id]
+            changed = {
+                field: value for field, value in player_delta.items()
+                if player.get(field) != value
+            }
+            if not changed:
+                continue
+
+            player = {**player, **changed}
+        else:
+            if not set(player_fields) <= player_delta.keys():
+                raise IncompletePlayer(user_id)
+
+            player = dict(player_delta)
+
+        players[user_id] = changed_players[user_id] = player
+
+    if changed_players:
+        merged["players"] = list(players.values())
+        changes["players"] = list(changed_players.values())
+
+    return merged, changes
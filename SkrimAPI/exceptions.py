@@ -15,3 +15,15 @@ class InvalidToken(SkrimAPIException):
     def __init__(self, msg: str = "Invalid token", status_code: int = 400,
                  *args: object) -> None:
         super().__init__(msg=msg, status_code=status_code, *args)
+
+
+class QueueNotFound(SkrimAPIException):
+    def __init__(self, msg: str = "Queue not found", status_code: int = 404,
+                 *args: object) -> None:
+        super().__init__(msg=msg, status_code=status_code, *args)
+
+
+class QueueFull(SkrimAPIException):
+    def __init__(self, msg: str = "Queue is full", status_code: int = 400,
+                 *args: object) -> None:
+        super().__init__(msg=msg, status_code=status_code, *args)
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left, insort
+from time import time
+from typing import Dict, List, Tuple
+from aiocache import Cache
+
+from .encoders import json_dumps
+from .metrics import CACHE_GET_SECONDS, CACHE_SET_SECONDS, CACHE_VALUE_BYTES
+
+
+class MatchFeedBase:
+    backend: str
+
+    def __init__(self, max_size: int = 500) -> None:
+        """Capped per league list of matches, newest first.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            Matches kept per league, by default 500
+
+        Notes
+        -----
+        Matches keep the position they were first pushed at,
+        pushing them again only updates their data.
+        Matches are stored JSON encoded.
+        """
+
+        self.max_size = max_size
+
+    @property
+    def _labels(self) -> Tuple[str, str]:
+        return "MatchFeed", self.backend
+
+    async def push(self, league_id: str, match_id: str,
+                   match: dict) -> None:
+        encoded = json_dumps(match)
+
+        CACHE_VALUE_BYTES.labels(*self._labels).observe(len(encoded))
+        with CACHE_SET_SECONDS.labels(*self._labels).time():
+            await self._push(league_id, match_id, encoded)
+
+    async def page(self, league_id: str, after: Tuple[float, str] = None,
+                   count: int = 25) -> List[Tuple[float, str, bytes]]:
+        """Used to get matches older than a position, newest first.
+
+        Parameters
+        ----------
+        league_id : str
+        after : Tuple[float, str], optional
+            Score & match ID of the last match seen,
+            by default None for the newest
+        count : int, optional
+            by default 25
+
+        Returns
+        -------
+        List[Tuple[float, str, bytes]]
+            Score, match ID & JSON encoded match.
+
+        Notes
+        -----
+        Costs the same however far into the feed the position is.
+        """
+
+        with CACHE_GET_SECONDS.labels(*self._labels).time():
+            return await self._page(league_id, after, count)
+
+    async def _push(self, league_id: str, match_id: str,
+                    match: bytes) -> None:
+        raise NotImplementedError()
+
+    async def _page(self, league_id: str, after: Tuple[float, str],
+                    count: int) -> List[Tuple[float, str, bytes]]:
+        raise NotImplementedError()
+
+
+class MemoryMatchFeed(MatchFeedBase):
+    backend = "memory"
+
+    def __init__(self, max_size: int = 500) -> None:
+        super().__init__(max_size)
+
+        # League ID to sorted (score, match ID) & match ID to match.
+        self.order: Dict[str, List[Tuple[float, str]]] = {}
+        self.matches: Dict[str, Dict[str, Tuple[float, bytes]]] = {}
+
+    async def _push(self, league_id: str, match_id: str,
+                    match: bytes) -> None:
+        order = self.order.setdefault(league_id, [])
+        matches = self.matches.setdefault(league_id, {})
+
+        if match_id in matches:
+            matches[match_id] = (matches[match_id][0], match)
+            return
+
+        score = time()
+        matches[match_id] = (score, match)
+        insort(order, (score, match_id))
+
+        if len(order) > self.max_size:
+            for _, trimmed in order[:len(order) - self.max_size]:
+                matches.pop(trimmed)
+            del order[:len(order) - self.max_size]
+
+    async def _page(self, league_id: str, after: Tuple[float, str],
+                    count: int) -> List[Tuple[float, str, bytes]]:
+        order = self.order.get(league_id, [])
+        matches = self.matches.get(league_id, {})
+
+        end = bisect_left(order, after) if after else len(order)
+
+        return [
+            (score, match_id, matches[match_id][1])
+            for score, match_id in reversed(order[max(end - count, 0):end])
+        ]
+
+
+class RedisMatchFeed(MatchFeedBase):
+    backend = "redis"
+
+    # KEYS: order zset, data hash
+    # ARGV: score, match ID, match, max size
+    PUSH_SCRIPT = """
+        redis.call('ZADD', KEYS[1], 'NX', ARGV[1], ARGV[2])
+        redis.call('HSET', KEYS[2], ARGV[2], ARGV[3])
+        local excess = redis.call('ZCARD', KEYS[1]) - tonumber(ARGV[4])
+        if excess > 0 then
+            local trimmed = redis.call('ZRANGE', KEYS[1], 0, excess - 1)
+            redis.call('ZREMRANGEBYRANK', KEYS[1], 0, excess - 1)
+            redis.call('HDEL', KEYS[2], unpack(trimmed))
+        end
+    """
+
+    # KEYS: order zset, data hash
+    # ARGV: score & match ID seen last, empty for the newest, count
+    PAGE_SCRIPT = """
+        local count = tonumber(ARGV[3])
+        local rows
+        if ARGV[2] == '' then
+            rows = redis.call(
+                'ZREVRANGE', KEYS[1], 0, count - 1, 'WITHSCORES'
+            )
+        else
+            local rank = redis.call('ZREVRANK', KEYS[1], ARGV[2])
+            if rank then
+                rows = redis.call(
+                    'ZREVRANGE', KEYS[1], rank + 1, rank + count,
+                    'WITHSCORES'
+                )
+            else
+                -- Seen match was trimmed, carry on from its score.
+                rows = redis.call(
+                    'ZREVRANGEBYSCORE', KEYS[1], '(' .. ARGV[1], '-inf',
+                    'WITHSCORES', 'LIMIT', 0, count
+                )
+            end
+        end
+        if #rows == 0 then
+            return {}
+        end
+        local ids = {}
+        for i = 1, #rows, 2 do
+            ids[#ids + 1] = rows[i]
+        end
+        local data = redis.call('HMGET', KEYS[2], unpack(ids))
+        local reply = {}
+        for i = 1, #ids do
+            if data[i] then
+                reply[#reply + 1] = rows[i * 2]
+                reply[#reply + 1] = ids[i]
+                reply[#reply + 1] = data[i]
+            end
+        end
+        return reply
+    """
+
+    def __init__(self, cache: Cache, max_size: int = 500) -> None:
+        """Match feed stored in a sorted set & hash,
+        scripts keep updates atomic between workers.
+
+        Parameters
+        ----------
+        cache : Cache
+            Redis cache.
+        max_size : int, optional
+            by default 500
+        """
+
+        super().__init__(max_size)
+
+        self.cache = cache
+
+    def _keys(self, league_id: str) -> List[str]:
+        key = "league-" + league_id + "-match-feed"
+        return [key, key + "-data"]
+
+    async def _push(self, league_id: str, match_id: str,
+                    match: bytes) -> None:
+        await self.cache.raw(
+            "eval", self.PUSH_SCRIPT, self._keys(league_id),
+            [time(), match_id, match, self.max_size]
+        )
+
+    async def _page(self, league_id: str, after: Tuple[float, str],
+                    count: int) -> List[Tuple[float, str, bytes]]:
+        score, match_id = after if after else (0.0, "")
+
+        # Score, match ID & match, decoded as utf-8 by the pool.
+        reply = await self.cache.raw(
+            "eval", self.PAGE_SCRIPT, self._keys(league_id),
+            [repr(score), match_id, count]
+        )
+
+        return [
+            (float(reply[index]), reply[index + 1],
+             reply[index + 2].encode())
+            for index in range(0, len(reply), 3)
+        ]
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+Sorted IP range table, memory mapped & binary searched,
+used before asking proxycheck.io about a IP.
+
+Build one from a CSV of start IP, end IP, ISO code & flags with
+python -m SkrimAPI.ip_ranges ranges.csv ranges.bin
+"""
+
+import csv
+import mmap
+import os
+import struct
+import sys
+
+from bisect import bisect_right
+from ipaddress import ip_address
+from typing import Iterable, Tuple, Union
+
+
+MAGIC = b"SKIPR1"
+HEADER = struct.Struct("!6sI")
+
+# Start & end as IPv6 (IPv4 mapped), ISO code & flags.
+RECORD = struct.Struct("!16s16s2sB")
+
+# Known proxy or VPN exit.
+FLAG_PROXY = 1
+# ASN belongs to a hosting provider.
+FLAG_HOSTING = 2
+
+
+def packed(ip: str) -> bytes:
+    """Used to get a IP as 16 bytes, IPv4 mapped into IPv6.
+
+    Parameters
+    ----------
+    ip : str
+
+    Returns
+    -------
+    bytes
+
+    Raises
+    ------
+    ValueError
+    """
+
+    address = ip_address(ip)
+    if address.version == 4:
+        return b"\x00" * 10 + b"\xff\xff" + address.packed
+
+    return address.packed
+
+
+class _Starts:
+    """Sequence of range starts, for bisect.
+    """
+
+    def __init__(self, table: "IPRanges") -> None:
+        self.table = table
+
+    def __len__(self) -> int:
+        return self.table.count
+
+    def __getitem__(self, index: int) -> bytes:
+        offset = HEADER.size + index * RECORD.size
+        return self.table.map[offset:offset + 16]
+
+
+class IPRanges:
+    def __init__(self, path: str) -> None:
+        """Used to look IPs up in a range table file.
+
+        Parameters
+        ----------
+        path : str
+
+        Raises
+        ------
+        ValueError
+            File isn't a range table or is truncated.
+        """
+
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < HEADER.size or (size - HEADER.size) % RECORD.size:
+                raise ValueError(
+                    "{} is {} bytes, not a header & whole {} byte records, "
+                    "the IP range table is truncated".format(
+                        path, size, RECORD.size
+                    )
+                )
+
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError("{} isn't a IP range table".format(path))
+
+        records = (size - HEADER.size) // RECORD.size
+        if records != self.count:
+            self.map.close()
+            raise ValueError(
+                "{} holds {} records but its header says {}, the IP "
+                "range table is truncated".format(path, records, self.count)
+            )
+
+        self.starts = _Starts(self)
+
+    def get(self, ip: str) -> Union[Tuple[bool, str], None]:
+        """Used to get details on a IP.
+
+        Parameters
+        ----------
+        ip : str
+
+        Returns
+        -------
+        bool
+            If proxy, VPN or hosting provider.
+        str
+            ISO code.
+        None
+            If the IP isn't in a range.
+        """
+
+        try:
+            key = packed(ip)
+        except ValueError:
+            return None
+
+        index = bisect_right(self.starts, key) - 1
+        if index < 0:
+            return None
+
+        _, end, isocode, flags = RECORD.unpack_from(
+            self.map, HEADER.size + index * RECORD.size
+        )
+        if key > end:
+            return None
+
+        return (
+            bool(flags & (FLAG_PROXY | FLAG_HOSTING)),
+            isocode.decode("ascii")
+        )
+
+    def close(self) -> None:
+        self.map.close()
+
+
+def write(path: str, ranges: Iterable[Tuple[str, str, str, int]]) -> None:
+    """Used to write a range table.
+
+    Parameters
+    ----------
+    path : str
+    ranges : Iterable[Tuple[str, str, str, int]]
+        Start IP, end IP, ISO code & flags.
+        Ranges must not overlap.
+    """
+
+    records = sorted(
+        (packed(start), packed(end), isocode.upper().encode("ascii"), flags)
+        for start, end, isocode, flags in ranges
+    )
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(records)))
+        for record in records:
+            file.write(RECORD.pack(*record))
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], newline="") as file:
+        write(sys.argv[2], (
+            (start, end, isocode, int(flags))
+            for start, end, isocode, flags in csv.reader(file)
+        ))
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Tuple
+
+
+class LocalCache:
+    def __init__(self, max_size: int, ttl: int) -> None:
+        """Bounded LRU held in this process.
+
+        Parameters
+        ----------
+        max_size : int
+        ttl : int
+        """
+
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        self.entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: str) -> Any:
+        if key in self.entries:
+            expires, value = self.entries[key]
+            if expires > monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+            del self.entries[key]
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self.entries[key] = (monotonic() + min(ttl, self.ttl), value)
+        self.entries.move_to_end(key)
+
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self.entries.pop(key, None)
@@ -2,17 +2,28 @@
 """
 
 from secrets import token_urlsafe
-from typing import Dict, Tuple
-from datetime import datetime
 
 from .exceptions import InvalidToken
+from .token_store import TokenStoreBase
 
 
 class LoginTokens:
-    login_tokens: Dict[str, str] = {}
-    user_tokens: Dict[str, Tuple[datetime, str]] = {}
+    # Seconds a login token is valid for.
+    login_ttl = 900
+    # Seconds a user token is valid for.
+    user_ttl = 45
 
-    def generate_login_token(self, league_id: str) -> str:
+    def __init__(self, store: TokenStoreBase) -> None:
+        """Used to handle login tokens.
+
+        Parameters
+        ----------
+        store : TokenStoreBase
+        """
+
+        self.store = store
+
+    async def generate_login_token(self, league_id: str) -> str:
         """Used to generate a login token
 
         Parameters
@@ -26,11 +37,16 @@ class LoginTokens:
         """
 
         login_token = token_urlsafe(36)
-        self.login_tokens[login_token] = league_id
+        # League ID is part of the key, so a wrong
+        # league can't use up the token.
+        await self.store.set(
+            "login-" + league_id + "-" + login_token, league_id,
+            self.login_ttl
+        )
         return login_token
 
-    def generate_user_token(self, league_id: str, login_token: str,
-                            user_id: str) -> str:
+    async def generate_user_token(self, league_id: str, login_token: str,
+                                  user_id: str) -> str:
         """Used to generate a user login token
 
         Parameters
@@ -49,18 +65,17 @@ class LoginTokens:
         InvalidToken
         """
 
-        if (login_token in self.login_tokens and
-                self.login_tokens[login_token] == league_id):
-            self.login_tokens.pop(login_token)
-
+        if await self.store.pop("login-" + league_id + "-" + login_token):
             user_login_token = token_urlsafe(36)
-            self.user_tokens[user_login_token] = (datetime.now(), user_id)
+            await self.store.set(
+                "user-" + user_login_token, user_id, self.user_ttl
+            )
 
             return user_login_token
         else:
             raise InvalidToken()
 
-    def get_user_id(self, user_login_token: str) -> str:
+    async def get_user_id(self, user_login_token: str) -> str:
         """Used to get a user id from a user login token
 
         Parameters
@@ -71,18 +86,14 @@ class LoginTokens:
         -------
         str
             User ID
+
+        Raises
+        ------
+        InvalidToken
         """
 
-        if user_login_token in self.user_tokens:
-            seconds = (
-                datetime.now() - self.user_tokens[user_login_token][0]
-            ).seconds
-            if seconds > 45:
-                self.user_tokens.pop(user_login_token)
-                raise InvalidToken()
-            else:
-                user_id = self.user_tokens[user_login_token]
-                self.user_tokens.pop(user_login_token)
-                return user_id[1]
-        else:
+        user_id = await self.store.pop("user-" + user_login_token)
+        if user_id is None:
             raise InvalidToken()
+
+        return user_id
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+
+from time import monotonic
+from typing import List, Tuple
+
+from OpenQueue.settings.match import MatchSettings
+
+from .resources import Sessions
+from .queue_store import QueueStoreBase
+from .settings.matchmaking import MatchmakingSettings
+from .metrics import (
+    MATCHMAKING_TICK_SECONDS,
+    MATCHMAKING_MATCHES_FORMED,
+    MATCHMAKING_FAILURES,
+    MATCHMAKING_REMOVED,
+    MATCHMAKING_BUDGET_EXCEEDED
+)
+
+
+logger = logging.getLogger("SkrimAPI")
+
+
+class Matchmaker:
+    def __init__(self, store: QueueStoreBase,
+                 settings: MatchmakingSettings) -> None:
+        """Forms matches from queues with a full lobby waiting.
+
+        Parameters
+        ----------
+        store : QueueStoreBase
+        settings : MatchmakingSettings
+
+        Notes
+        -----
+        Every worker can run one, lobbies are popped
+        atomically so players are only matched once.
+        """
+
+        self.store = store
+        self.settings = settings
+
+    async def run(self) -> None:
+        """Used to tick every interval till cancelled.
+        """
+
+        while True:
+            started = monotonic()
+
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Matchmaking tick failed")
+
+            await asyncio.sleep(max(
+                0, self.settings.tick_interval - (monotonic() - started)
+            ))
+
+    async def tick(self) -> int:
+        """Used to pop full lobbies & create their matches.
+
+        Returns
+        -------
+        int
+            Matches formed.
+
+        Notes
+        -----
+        A queue's capacity is its lobby size. Queues with the
+        longest waiting player go first, one lobby per queue per
+        round, so a large queue can't starve the rest. Popping
+        stops once the tick budget is spent, lobbies left over
+        wait for the next tick.
+        """
+
+        with MATCHMAKING_TICK_SECONDS.time():
+            deadline = monotonic() + self.settings.tick_budget
+
+            queue_ids = await self.store.queue_ids()
+            queues = await asyncio.gather(
+                *[self.store.waiting(queue_id) for queue_id in queue_ids]
+            )
+
+            ready = []
+            for queue_id, waiting in zip(queue_ids, queues):
+                if not waiting:
+                    continue
+
+                league_id, lobby_size, count, joined = waiting
+                if lobby_size and count >= lobby_size:
+                    ready.append((
+                        joined, queue_id, league_id, lobby_size,
+                        count // lobby_size
+                    ))
+
+            ready.sort()
+
+            creating = []
+            while ready:
+                if monotonic() >= deadline:
+                    MATCHMAKING_BUDGET_EXCEEDED.inc()
+                    break
+
+                next_round = []
+                for joined, queue_id, league_id, lobby_size, lobbies in ready:
+                    members = await self.store.pop(queue_id, lobby_size)
+                    if not members:
+                        continue
+
+                    creating.append(asyncio.ensure_future(
+                        self.create(queue_id, league_id, members)
+                    ))
+
+                    if lobbies > 1:
+                        next_round.append((
+                            joined, queue_id, league_id, lobby_size,
+                            lobbies - 1
+                        ))
+
+                ready = next_round
+
+            formed = sum(await asyncio.gather(*creating))
+
+        MATCHMAKING_MATCHES_FORMED.inc(formed)
+
+        return formed
+
+    async def create(self, queue_id: str, league_id: str,
+                     members: List[Tuple[str, float, int]]) -> bool:
+        """Used to create a match for a lobby, puts
+        the lobby back in its queue if it fails.
+
+        Parameters
+        ----------
+        queue_id : str
+        league_id : str
+        members : List[Tuple[str, float, int]]
+            As given by pop.
+
+        Returns
+        -------
+        bool
+            If the match was created.
+
+        Notes
+        -----
+        Players whose lobby failed max_failures times are left
+        out, so a lobby which can't become a match (e.g. a
+        banned player) doesn't block its queue forever.
+        """
+
+        match_settings = MatchSettings(
+            team_1_name=self.settings.team_1_name,
+            team_2_name=self.settings.team_2_name,
+            connection_time=self.settings.connection_time,
+            knife_round=self.settings.knife_round,
+            wait_for_spectators=self.settings.wait_for_spectators,
+            warmup_time=self.settings.warmup_time
+        )
+
+        try:
+            match_settings.maps(self.settings.maps).random()
+            await match_settings.players().elo(
+                [user_id for user_id, _, _ in members]
+            )
+            match_settings.captains().elo()
+
+            await Sessions.base.league(league_id).create_match(
+                match_settings
+            )
+        except Exception:
+            logger.exception("Creating match for queue %s failed", queue_id)
+            MATCHMAKING_FAILURES.inc()
+
+            restored = []
+            removed = []
+            for user_id, joined, failures in members:
+                if failures + 1 < self.settings.max_failures:
+                    restored.append((user_id, joined, failures + 1))
+                else:
+                    removed.append(user_id)
+
+            if restored:
+                await self.store.restore(queue_id, restored)
+
+            if removed:
+                logger.warning(
+                    "Removed %s from queue %s after %d failed matches",
+                    ", ".join(removed), queue_id, self.settings.max_failures
+                )
+                MATCHMAKING_REMOVED.inc(len(removed))
+
+            return False
+
+        return True
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+Metrics exported through /api/metrics/ along
+with starlette_prometheus's HTTP metrics.
+"""
+
+from prometheus_client import Counter, Histogram
+
+
+CACHE_HITS = Counter(
+    "skrim_cache_hits_total",
+    "Cache reads which found a value.",
+    ["cache", "backend", "tier"]
+)
+CACHE_MISSES = Counter(
+    "skrim_cache_misses_total",
+    "Cache reads which found nothing.",
+    ["cache", "backend"]
+)
+CACHE_GET_SECONDS = Histogram(
+    "skrim_cache_get_seconds",
+    "Time spent reading from the shared cache.",
+    ["cache", "backend"]
+)
+CACHE_SET_SECONDS = Histogram(
+    "skrim_cache_set_seconds",
+    "Time spent writing to the shared cache.",
+    ["cache", "backend"]
+)
+CACHE_VALUE_BYTES = Histogram(
+    "skrim_cache_value_bytes",
+    "Size of values written to the cache.",
+    ["cache", "backend"],
+    buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+)
+
+CACHE_LOADS = Counter(
+    "skrim_cache_loads_total",
+    "Loader calls made after a miss.",
+    ["cache"]
+)
+CACHE_DEDUPLICATED = Counter(
+    "skrim_cache_deduplicated_total",
+    "Misses which joined a in-flight load instead of loading.",
+    ["cache"]
+)
+CACHE_STALE_SERVES = Counter(
+    "skrim_cache_stale_serves_total",
+    "Stale values served while being refreshed.",
+    ["cache"]
+)
+CACHE_REFRESHES = Counter(
+    "skrim_cache_refreshes_total",
+    "Background refreshes started.",
+    ["cache"]
+)
+
+MATCHMAKING_TICK_SECONDS = Histogram(
+    "skrim_matchmaking_tick_seconds",
+    "Time spent scanning queues & creating matches per tick."
+)
+MATCHMAKING_MATCHES_FORMED = Counter(
+    "skrim_matchmaking_matches_formed_total",
+    "Matches created from full queues."
+)
+MATCHMAKING_FAILURES = Counter(
+    "skrim_matchmaking_failures_total",
+    "Lobbies whose match couldn't be created."
+)
+MATCHMAKING_REMOVED = Counter(
+    "skrim_matchmaking_removed_total",
+    "Players removed from their queue after too many failed matches."
+)
+MATCHMAKING_BUDGET_EXCEEDED = Counter(
+    "skrim_matchmaking_budget_exceeded_total",
+    "Ticks which left full lobbies for the next tick."
+)
@@ -1,10 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import binascii
-import bcrypt
+import hmac
 
-from typing import Tuple, Union
+from typing import Any, Awaitable, Dict, FrozenSet, Mapping, Tuple, Union
 from base64 import b64decode
+from functools import lru_cache
+from secrets import token_urlsafe
+from time import time
+from types import MappingProxyType
 
 from starlette.authentication import (
     AuthenticationBackend,
@@ -12,12 +16,242 @@ from starlette.authentication import (
     SimpleUser,
     AuthCredentials
 )
+from starlette.datastructures import MutableHeaders
 from starlette.responses import JSONResponse
-from starlette.requests import Request
+from starlette.requests import HTTPConnection, Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from .authentication import api_key, admin_scopes
-from .resources import Config, Queues, Sessions
-from .caching import CacheAPIKey
+from OpenQueue import League
+
+from .authentication import (
+    cached_api_key,
+    valid_api_key,
+    cached_admin_scopes
+)
+from .resources import Config, Sessions
+from .caching import CacheAPIKey, CacheAdminScopes, CacheSession
+from .scopes import ScopeCredentials
+
+
+# Length of token_urlsafe(16).
+SESSION_ID_LENGTH = 22
+
+CACHING_SCOPES = frozenset(("caching",))
+SITE_SCOPES = frozenset(("site",))
+
+
+@lru_cache(maxsize=None)
+def site_user_scopes(root: bool, owner: bool, queue: bool
+                     ) -> Tuple[FrozenSet[str], Mapping[str, bool]]:
+    """Used to get scopes for a logged in user viewing a user.
+
+    Parameters
+    ----------
+    root : bool
+    owner : bool
+        If viewing themselves.
+    queue : bool
+        If a queue was given.
+
+    Returns
+    -------
+    FrozenSet[str]
+    Mapping[str, bool]
+        Read only public schema.
+    """
+
+    scopes = ["site", "site.loggedIn", "user"]
+    public_schema = {}
+
+    if root:
+        scopes.append("site.rootLoggedIn")
+
+    if owner:
+        scopes.append("user.owner")
+        public_schema["user.owner"] = False
+        public_schema["user"] = False
+    else:
+        public_schema["user"] = True
+
+    if queue:
+        scopes += ["queue.user.join", "queue.user.leave", "queue.get"]
+
+        public_schema["queue.get"] = True
+        public_schema["queue.user.join"] = True
+        public_schema["queue.user.leave"] = True
+
+    return frozenset(scopes), MappingProxyType(public_schema)
+
+
+@lru_cache(maxsize=None)
+def site_league_scopes(root: bool, league_owner: bool
+                       ) -> Tuple[FrozenSet[str], Mapping[str, bool]]:
+    """Used to get league scopes for a logged in user viewing a league.
+
+    Parameters
+    ----------
+    root : bool
+    league_owner : bool
+
+    Returns
+    -------
+    FrozenSet[str]
+    Mapping[str, bool]
+        Read only public schema.
+
+    Notes
+    -----
+    Admin scopes are applied on top of these.
+    """
+
+    scopes = ["site", "site.loggedIn", "league", "league.matches",
+              "league.users"]
+    public_schema = {"league.matches": True, "league.users": True}
+
+    if root:
+        scopes.append("site.rootLoggedIn")
+
+    if league_owner:
+        scopes.append("league.owner")
+
+        public_schema["league"] = False
+        public_schema["league.owner"] = False
+    else:
+        public_schema["league"] = True
+
+    return frozenset(scopes), MappingProxyType(public_schema)
+
+
+@lru_cache(maxsize=None)
+def site_league_target_scopes(user: bool, user_owner: bool, ban: bool,
+                              match: bool
+                              ) -> Tuple[FrozenSet[str], Mapping[str, bool]]:
+    """Used to get scopes for the user or match given with a league.
+
+    Parameters
+    ----------
+    user : bool
+        If a user was given.
+    user_owner : bool
+        If the user given is them.
+    ban : bool
+        If a ban was given.
+    match : bool
+        If a match was given.
+
+    Returns
+    -------
+    FrozenSet[str]
+    Mapping[str, bool]
+        Read only public schema.
+
+    Notes
+    -----
+    Applied after admin scopes, so these public schema flags win.
+    """
+
+    scopes = []
+    public_schema = {}
+
+    if user:
+        scopes += ["league.user", "league.user.matches"]
+
+        public_schema["league.user.matches"] = True
+
+        if user_owner:
+            scopes.append("league.user.owner")
+            public_schema["league.user"] = False
+            public_schema["league.user.owner"] = False
+        else:
+            public_schema["league.user"] = True
+
+        if ban:
+            scopes.append("league.user.ban")
+            public_schema["league.user.ban"] = True
+
+    if match:
+        scopes += ["league.match", "league.match.scoreboard"]
+
+        public_schema["league.match"] = True
+        public_schema["league.match.scoreboard"] = True
+
+    return frozenset(scopes), MappingProxyType(public_schema)
+
+
+@lru_cache(maxsize=None)
+def site_league_all_scopes(root: bool, league_owner: bool, user: bool,
+                           user_owner: bool, ban: bool, match: bool
+                           ) -> Tuple[FrozenSet[str], Mapping[str, bool]]:
+    """Used to get scopes for a logged in user
+    viewing a league, without admin scopes.
+
+    Returns
+    -------
+    FrozenSet[str]
+    Mapping[str, bool]
+        Read only public schema.
+    """
+
+    league_scopes, league_public = site_league_scopes(root, league_owner)
+    target_scopes, target_public = site_league_target_scopes(
+        user, user_owner, ban, match
+    )
+
+    return league_scopes | target_scopes, MappingProxyType(
+        {**league_public, **target_public}
+    )
+
+
+@lru_cache(maxsize=None)
+def site_scopes(root: bool) -> FrozenSet[str]:
+    """Used to get scopes for a logged in user viewing neither.
+
+    Parameters
+    ----------
+    root : bool
+
+    Returns
+    -------
+    FrozenSet[str]
+    """
+
+    if root:
+        return frozenset(("site", "site.loggedIn", "site.rootLoggedIn"))
+
+    return frozenset(("site", "site.loggedIn"))
+
+
+def league_states(league: League, user_id: Union[str, None],
+                  ban_id: Union[str, None], match_id: Union[str, None]
+                  ) -> Dict[str, Any]:
+    """Used to build the league, user, ban & match states given.
+
+    Parameters
+    ----------
+    league : League
+    user_id : Union[str, None]
+    ban_id : Union[str, None]
+        Only used with a user.
+    match_id : Union[str, None]
+
+    Returns
+    -------
+    Dict[str, Any]
+        Used as the request's state.
+    """
+
+    state = {"league": league}
+
+    if user_id is not None:
+        user = state["user"] = league.user(user_id)
+
+        if ban_id is not None:
+            state["ban"] = user.ban(ban_id)
+
+    if match_id is not None:
+        state["match"] = league.match(match_id)
+
+    return state
 
 
 class AuthenticateMiddleware(AuthenticationBackend):
@@ -42,166 +276,249 @@ class AuthenticateMiddleware(AuthenticationBackend):
 
             # If CachingWebhook in headers, check its password.
             if "CachingWebhook" in request.headers:
-                hashed_password = bcrypt.hashpw(
-                    Config.webhooks.key.encode(),
-                    bcrypt.gensalt()
-                )
-                if bcrypt.checkpw(password.encode(), hashed_password):
-                    return AuthCredentials(["caching"]), SimpleUser("root")
-
-            cache = CacheAPIKey(password)
-            cache_get = await cache.get()
-            if cache_get:
-                request.state.league, user_id, scopes = cache_get
-            else:
-                try:
-                    (
-                        request.state.league,
-                        user_id,
-                        scopes
-                    ) = await api_key(password)
-                except AuthenticationError:
-                    raise
-                else:
-                    await cache.set((
-                        request.state.league,
-                        user_id,
-                        scopes
-                    ))
-
-            if "user" in request.query_params:
-                request.state.user = request.state.league.user(
-                    request.query_params["user"]
-                )
+                if hmac.compare_digest(password.encode(),
+                                       Config.webhooks.key.encode()):
+                    return ScopeCredentials(CACHING_SCOPES), SimpleUser("root")
 
-                if "ban" in request.query_params:
-                    request.state.ban = request.state.user.ban(
-                        request.query_params["ban"]
-                    )
-
-            if "match" in request.query_params:
-                request.state.match = request.state.league.match(
-                    request.query_params["match"]
-                )
+            if not valid_api_key(password):
+                raise AuthenticationError()
 
-            if "queue" in request.query_params:
-                if request.query_params["queue"] in Queues.active:
-                    request.state.queue = Queues.active[
-                        request.query_params["queue"]
-                    ]
+            def load() -> Awaitable:
+                return cached_api_key(password)
 
-            request.state.public_schema = scopes
-            return AuthCredentials(list(scopes.keys())), SimpleUser(user_id)
+            cache = CacheAPIKey(password)
+            cache_get = await cache.get(load)
+            if cache_get is None:
+                cache_get = await cache.load(load)
 
-        elif ("login" in request.session and
-                request.session["login"]["email_confirmed"]):
-            user_id = request.session["login"]["identifiers"]["user"]
-            scopes = ["site", "site.loggedIn"]
-            request.state.public_schema = {}
+            if cache_get is False:
+                raise AuthenticationError()
 
-            if user_id in Config.api.root_users:
-                scopes.append("site.rootLoggedIn")
+            league, user_id, granted, public = cache_get
+            scopes, public_schema = await Sessions.scopes.resolve(
+                granted, public
+            )
 
-            if ("user" in request.query_params and
-                    "league" not in request.query_params):
-                scopes.append("user")
+            query_params = request.query_params
 
-                request.state.user = Sessions.base.user(
-                    request.query_params["user"]
-                )
+            state = league_states(
+                league,
+                query_params.get("user"),
+                query_params.get("ban"),
+                query_params.get("match")
+            )
 
-                if request.query_params["user"] == user_id:
-                    scopes.append("user.owner")
-                    request.state.public_schema["user.owner"] = False
-                    request.state.public_schema["user"] = False
-                else:
-                    request.state.public_schema["user"] = True
+            # Only the ID, endpoints read the queue from the store.
+            queue_id = query_params.get("queue")
+            if queue_id is not None:
+                state["queue"] = queue_id
 
-                if "queue" in request.query_params:
-                    if request.query_params["queue"] in Queues.active:
-                        request.state.queue = Queues.active[
-                            request.query_params["queue"]
-                        ]
+            state["public_schema"] = public_schema
+            request.scope["state"] = state
 
-                        scopes += [
-                            "queue.user.join", "queue.user.leave", "queue.get"
-                        ]
+            return ScopeCredentials(scopes), SimpleUser(user_id)
 
-                        request.state.public_schema["queue.get"] = True
-                        request.state.public_schema["queue.user.join"] = True
-                        request.state.public_schema["queue.user.leave"] = True
-            elif "league" in request.query_params:
-                scopes += ["league", "league.matches", "league.users"]
+        elif ("login" in request.session and
+                request.session["login"]["email_confirmed"]):
+            login = request.session["login"]
+            query_params = request.query_params
 
-                request.state.public_schema["league.matches"] = True
+            user_id = login["identifiers"]["user"]
+            root = user_id in Config.api.root_users
 
-                request.state.league = Sessions.base.league(
-                    request.query_params["league"]
+            if "user" in query_params and "league" not in query_params:
+                scopes, public_schema = site_user_scopes(
+                    root,
+                    query_params["user"] == user_id,
+                    "queue" in query_params
                 )
 
-                if (request.query_params["league"] in
-                        request.session["login"]["league_ids"]):
-                    scopes.append("league.owner")
-
-                    request.state.public_schema["league"] = False
-                    request.state.public_schema["league.owner"] = False
-                else:
-                    request.state.public_schema["league"] = True
-
-                if (
-                    "check_admin" in request.query_params
-                    and request.query_params["check_admin"].lower() == "true"
-                   ):
-                    allowed_scopes = await admin_scopes(
-                        user_id,
-                        request.query_params["league"]
+                state = {"user": Sessions.base.user(query_params["user"])}
+                if "queue" in query_params:
+                    state["queue"] = query_params["queue"]
+
+            elif "league" in query_params:
+                league_id = query_params["league"]
+                target_user = query_params.get("user")
+                ban_id = query_params.get("ban")
+                match_id = query_params.get("match")
+
+                flags = (
+                    target_user is not None,
+                    target_user == user_id,
+                    target_user is not None and ban_id is not None,
+                    match_id is not None
+                )
+                league_owner = league_id in login["league_ids"]
+
+                allowed_scopes = None
+                if query_params.get("check_admin", "").lower() == "true":
+                    def load_admin() -> Awaitable:
+                        return cached_admin_scopes(league_id, user_id)
+
+                    cache = CacheAdminScopes(league_id, user_id)
+                    allowed_scopes = await cache.get(load_admin)
+                    if allowed_scopes is None:
+                        allowed_scopes = await cache.load(load_admin)
+
+                if allowed_scopes:
+                    # Admin scopes go between the league & the user or
+                    # match given, so defaults for those still win.
+                    league_scopes, league_public = site_league_scopes(
+                        root, league_owner
+                    )
+                    target_scopes, target_public = (
+                        site_league_target_scopes(*flags)
                     )
 
-                    request.state.public_schema = {
-                        **request.state.public_schema,
-                        **allowed_scopes
+                    scopes = (league_scopes | target_scopes
+                              | frozenset(allowed_scopes.keys()))
+                    public_schema = {
+                        **league_public, **allowed_scopes, **target_public
                     }
-
-                    scopes += list(allowed_scopes.keys())
-
-                if "user" in request.query_params:
-                    scopes += ["league.user", "league.user.matches"]
-
-                    request.state.public_schema["league.user.matches"] = True
-
-                    if request.query_params["user"] == user_id:
-                        scopes.append("league.user.owner")
-                        request.state.public_schema["league.user"] = False
-                        request.state.public_schema[
-                            "league.user.owner"
-                        ] = False
-                    else:
-                        request.state.public_schema["league.user"] = True
-
-                    request.state.user = request.state.league.user(
-                        request.query_params["user"]
+                else:
+                    scopes, public_schema = site_league_all_scopes(
+                        root, league_owner, *flags
                     )
 
-                    if "ban" in request.query_params:
-                        scopes.append("league.user.ban")
-                        request.state.public_schema["league.user.ban"] = True
+                state = league_states(
+                    Sessions.base.league(league_id),
+                    target_user, ban_id, match_id
+                )
 
-                        request.state.ban = request.state.user.ban(
-                            request.query_params["ban"]
-                        )
+            else:
+                scopes, public_schema = site_scopes(root), {}
+                state = {}
 
-                if "match" in request.query_params:
-                    scopes += ["league.match", "league.match.scoreboard"]
+            state["public_schema"] = public_schema
+            request.scope["state"] = state
 
-                    request.state.public_schema["league.match"] = True
-                    request.state.public_schema[
-                        "league.match.scoreboard"
-                    ] = True
+            return ScopeCredentials(scopes), SimpleUser(user_id)
+        else:
+            return ScopeCredentials(SITE_SCOPES), SimpleUser("")
+
+
+class SessionMiddleware:
+    def __init__(self, app: ASGIApp, session_cookie: str = "session",
+                 max_age: int = CacheSession.ttl, same_site: str = "lax",
+                 https_only: bool = False, refresh_below: int = None
+                 ) -> None:
+        """Sessions stored in the cache, the cookie only
+        holds a random session ID.
+
+        Parameters
+        ----------
+        app : ASGIApp
+        session_cookie : str, optional
+            by default "session"
+        max_age : int, optional
+            Seconds after the last request a session
+            is kept for, by default 14 days
+        same_site : str, optional
+            by default "lax"
+        https_only : bool, optional
+            by default False
+        refresh_below : int, optional
+            Seconds left under which a request keeps the
+            session for max_age again, by default half max_age
+
+        Notes
+        -----
+        Drop in for starlette's SessionMiddleware, the session is
+        only stored & the cookie only sent when the session changes
+        or is refreshed, so most requests don't write.
+        """
 
-                    request.state.match = request.state.league.match(
-                        request.query_params["match"]
-                    )
+        self.app = app
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.refresh_below = (
+            max_age // 2 if refresh_below is None else refresh_below
+        )
+        self.security_flags = "httponly; samesite=" + same_site
+        if https_only:
+            self.security_flags += "; secure"
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        connection = HTTPConnection(scope)
+
+        session_id = connection.cookies.get(self.session_cookie)
+        session = None
+        expires = 0.0
+        # Longer IDs are cookies from before sessions were server side.
+        if session_id and len(session_id) <= SESSION_ID_LENGTH:
+            session, expires = await CacheSession(session_id).get_expiring()
+
+        if session is None:
+            initial = b""
+            scope["session"] = {}
+        else:
+            initial = CacheSession.codec.dumps(session)
+            scope["session"] = session
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                await self.save(
+                    scope, message, session_id, initial,
+                    expires - time() < self.refresh_below
+                )
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def save(self, scope: Scope, message: Message,
+                   session_id: Union[str, None], initial: bytes,
+                   refresh: bool = False) -> None:
+        """Used to store a changed session & set the cookie.
+
+        Parameters
+        ----------
+        scope : Scope
+        message : Message
+            Response start.
+        session_id : Union[str, None]
+            ID from the cookie.
+        initial : bytes
+            Session as loaded, empty if none.
+        refresh : bool, optional
+            If a unchanged session should be kept for
+            max_age again, by default False
+        """
 
-            return AuthCredentials(scopes), SimpleUser(user_id)
+        if scope["session"]:
+            if (not refresh and
+                    CacheSession.codec.dumps(scope["session"]) == initial):
+                return
+
+            # A new ID when a session starts, so IDs given
+            # before logging in can't be used after.
+            if not initial:
+                session_id = token_urlsafe(16)
+
+            await CacheSession(session_id).set(
+                scope["session"], ttl=self.max_age
+            )
+
+            header_value = "{}={}; path=/; Max-Age={}; {}".format(
+                self.session_cookie, session_id,
+                self.max_age, self.security_flags
+            )
+        elif session_id:
+            if initial:
+                await CacheSession(session_id).delete()
+
+            header_value = "{}=null; path=/; {}; {}".format(
+                self.session_cookie,
+                "expires=Thu, 01 Jan 1970 00:00:00 GMT",
+                self.security_flags
+            )
         else:
-            return AuthCredentials(["site"]), SimpleUser("")
+            return
+
+        MutableHeaders(scope=message).append("Set-Cookie", header_value)
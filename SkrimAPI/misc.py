@@ -3,13 +3,13 @@
 from starlette.requests import Request
 from starlette.datastructures import State
 
-from OpenQueue import League, User, Queue
+from OpenQueue import League, User
 
 
 class SkrimState(State):
     league: League
     user: User
-    queue: Queue
+    queue: str
 
 
 class SkrimRequest(Request):
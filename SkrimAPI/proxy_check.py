@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
-from typing import Tuple, Union
+import asyncio
+
+from typing import Dict, Tuple, Union
 from sqlalchemy.sql import select
 from proxycheck.exceptions import ProxyCheckException
 
@@ -9,6 +11,9 @@ from .tables import proxy_table
 
 
 class ProxyCheck:
+    # In-flight checks by IP, shared by every instance.
+    loading: Dict[str, asyncio.Future] = {}
+
     def __init__(self, ip: str, discord_id: int) -> None:
         """Used to use proxy check cached.
 
@@ -18,7 +23,7 @@ class ProxyCheck:
         discord_id : imt
         """
 
-        self.ip = Sessions.proxy.ip(ip)
+        self.ip = ip
         self.discord_id = discord_id
 
     async def get(self) -> Tuple[bool, str, Union[int, None]]:
@@ -33,35 +38,66 @@ class ProxyCheck:
         int
             Discord ID of user if IP already regerseted
             will ne None if IP only just cached.
+
+        Notes
+        -----
+        Concurrent checks for the same IP share one lookup,
+        only the first caller's Discord ID is stored.
         """
 
+        cached = Sessions.proxy_lookup.cache.get(self.ip)
+        if cached:
+            return cached[0], cached[1], None
+
+        owner = self.ip not in ProxyCheck.loading
+        if owner:
+            ProxyCheck.loading[self.ip] = asyncio.ensure_future(self._load())
+            ProxyCheck.loading[self.ip].add_done_callback(
+                lambda _: ProxyCheck.loading.pop(self.ip, None)
+            )
+
+        details = await asyncio.shield(ProxyCheck.loading[self.ip])
+        if details is None:
+            return False, "Unknown", self.discord_id
+
+        proxy, isocode, inserted = details
+        return proxy, isocode, self.discord_id if inserted and owner else None
+
+    async def _load(self) -> Union[Tuple[bool, str, bool], None]:
         row = await Sessions.database.fetch_one(
             select([
                 proxy_table.c.proxy,
                 proxy_table.c.isocode,
                 proxy_table.c.discord_id
             ]).select_from(proxy_table).where(
-                proxy_table.c.ip == self.ip.ip
+                proxy_table.c.ip == self.ip
             )
         )
 
         if row:
-            return row["proxy"], row["isocode"], None
+            Sessions.proxy_lookup.cache.set(
+                self.ip, (row["proxy"], row["isocode"]),
+                Sessions.proxy_lookup.cache.ttl
+            )
+            return row["proxy"], row["isocode"], False
 
         try:
-            details = await self.ip.get(asn=True, vpn=True)
+            proxy, isocode = await Sessions.proxy_lookup.lookup(self.ip)
         except ProxyCheckException:
-            return False, "Unknown", self.discord_id
-        else:
-            details.isocode = details.isocode.upper()
-
-            await Sessions.database.execute(
-                proxy_table.insert().values(
-                    ip=self.ip.ip,
-                    proxy=details.proxy,
-                    isocode=details.isocode,
-                    discord_id=self.discord_id
-                )
+            return None
+
+        # Ignored if another worker inserted the IP first.
+        await Sessions.database.execute(
+            proxy_table.insert().prefix_with("IGNORE").values(
+                ip=self.ip,
+                proxy=proxy,
+                isocode=isocode,
+                discord_id=self.discord_id
             )
+        )
+
+        Sessions.proxy_lookup.cache.set(
+            self.ip, (proxy, isocode), Sessions.proxy_lookup.cache.ttl
+        )
 
-            return details.proxy, details.isocode, self.discord_id
+        return proxy, isocode, True
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import proxycheck
+
+from typing import Dict, List, Tuple
+from proxycheck.model import IpModel
+from proxycheck.exceptions import QueryFailed, QueryDenied
+
+from .local_cache import LocalCache
+from .ip_ranges import IPRanges
+
+
+logger = logging.getLogger("SkrimAPI")
+
+# If proxy & ISO code.
+Details = Tuple[bool, str]
+
+
+class ProxyProviderBase:
+    async def lookup(self, ips: List[str]) -> Dict[str, Details]:
+        """Used to look up many IPs in one request.
+
+        Parameters
+        ----------
+        ips : List[str]
+
+        Returns
+        -------
+        Dict[str, Details]
+            IP to if proxy & ISO code, IPs
+            without details are left out.
+
+        Raises
+        ------
+        ProxyCheckException
+        """
+
+        raise NotImplementedError()
+
+
+class ProxyCheckProvider(ProxyProviderBase):
+    def __init__(self, client: proxycheck.Awaiting) -> None:
+        """Looks IPs up on proxycheck.io, which takes
+        many IPs when POSTed.
+
+        Parameters
+        ----------
+        client : proxycheck.Awaiting
+        """
+
+        self.client = client
+
+    async def lookup(self, ips: List[str]) -> Dict[str, Details]:
+        resp = await self.client.requests.post(
+            self.client.API_URL,
+            params={"vpn": 1, "asn": 1},
+            data={"ips": ",".join(ips)}
+        )
+        resp.raise_for_status()
+
+        resp_json = resp.json()
+        if resp_json["status"] == "error":
+            raise QueryFailed(resp_json["message"])
+        elif resp_json["status"] not in ("ok", "warning"):
+            raise QueryDenied(resp_json["message"])
+
+        if resp_json["status"] == "warning":
+            logger.warning(resp_json["message"])
+
+        details = {}
+        for ip in ips:
+            if ip in resp_json:
+                model = IpModel(resp_json[ip])
+                details[ip] = (
+                    bool(model.proxy), (model.isocode or "Unknown").upper()
+                )
+
+        return details
+
+
+class StubProxyProvider(ProxyProviderBase):
+    def __init__(self, details: Dict[str, Details] = None,
+                 default: Details = (False, "Unknown")) -> None:
+        """Local provider for tests & development.
+
+        Parameters
+        ----------
+        details : Dict[str, Details], optional
+            IP to details, by default None
+        default : Details, optional
+            Details for IPs not given, by default (False, "Unknown")
+        """
+
+        self.details = details or {}
+        self.default = default
+
+        # IPs of each lookup made.
+        self.batches: List[List[str]] = []
+
+    async def lookup(self, ips: List[str]) -> Dict[str, Details]:
+        self.batches.append(list(ips))
+
+        return {ip: self.details.get(ip, self.default) for ip in ips}
+
+
+class ProxyLookup:
+    def __init__(self, provider: ProxyProviderBase,
+                 cache_size: int = 4096, cache_ttl: int = 3600,
+                 batch_size: int = 100, batch_wait: float = 0.01,
+                 ranges: IPRanges = None) -> None:
+        """Batches lookups made close together into one
+        provider request, each IP is only looked up once
+        at a time.
+
+        Parameters
+        ----------
+        provider : ProxyProviderBase
+        cache_size : int, optional
+            IPs kept in memory, by default 4096
+        cache_ttl : int, optional
+            by default 3600
+        batch_size : int, optional
+            Max IPs per provider request, by default 100
+        batch_wait : float, optional
+            Seconds to wait for more IPs, by default 0.01
+        ranges : IPRanges, optional
+            Checked before the provider, by default None
+        """
+
+        self.provider = provider
+        self.ranges = ranges
+        self.cache = LocalCache(cache_size, cache_ttl)
+
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+
+        self.loading: Dict[str, asyncio.Future] = {}
+        self.pending: List[str] = []
+        self.flush_handle: asyncio.TimerHandle = None
+
+    async def lookup(self, ip: str) -> Details:
+        """Used to look up a IP.
+
+        Parameters
+        ----------
+        ip : str
+
+        Returns
+        -------
+        Details
+
+        Raises
+        ------
+        ProxyCheckException
+        """
+
+        if self.ranges:
+            details = self.ranges.get(ip)
+            if details:
+                return details
+
+        if ip not in self.loading:
+            loop = asyncio.get_event_loop()
+
+            self.loading[ip] = loop.create_future()
+            self.pending.append(ip)
+
+            if len(self.pending) >= self.batch_size:
+                self._flush()
+            elif self.flush_handle is None:
+                self.flush_handle = loop.call_later(
+                    self.batch_wait, self._flush
+                )
+
+        return await asyncio.shield(self.loading[ip])
+
+    async def lookup_many(self, ips: List[str]) -> List[Details]:
+        """Used to look up many IPs in as few requests as possible.
+
+        Parameters
+        ----------
+        ips : List[str]
+
+        Returns
+        -------
+        List[Details]
+            In the order given.
+
+        Raises
+        ------
+        ProxyCheckException
+        """
+
+        return await asyncio.gather(*[self.lookup(ip) for ip in ips])
+
+    def _flush(self) -> None:
+        if self.flush_handle:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+        ips, self.pending = self.pending, []
+        asyncio.ensure_future(self._lookup(ips))
+
+    async def _lookup(self, ips: List[str]) -> None:
+        try:
+            details = await self.provider.lookup(ips)
+        except Exception as error:
+            # Every waiter has to be woken, whatever went wrong.
+            for ip in ips:
+                self.loading.pop(ip).set_exception(error)
+        else:
+            for ip in ips:
+                future = self.loading.pop(ip)
+                if ip in details:
+                    future.set_result(details[ip])
+                else:
+                    future.set_exception(
+                        QueryFailed("No details given for " + ip)
+                    )
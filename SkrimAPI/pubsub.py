@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import aioredis
+
+from typing import Callable, Dict, List
+from aiocache import Cache
+
+
+logger = logging.getLogger("SkrimAPI")
+
+
+class PubSubBase:
+    """Used to send messages between workers.
+    """
+
+    async def publish(self, channel: str, message: str) -> None:
+        raise NotImplementedError()
+
+    async def subscribe(self, channel: str,
+                        callback: Callable[[str], None]) -> None:
+        raise NotImplementedError()
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryPubSub(PubSubBase):
+    def __init__(self) -> None:
+        """In process stand-in for RedisPubSub, used with the
+        memory cache & for testing.
+        """
+
+        self.callbacks: Dict[str, List[Callable[[str], None]]] = {}
+
+    async def publish(self, channel: str, message: str) -> None:
+        for callback in self.callbacks.get(channel, []):
+            callback(message)
+
+    async def subscribe(self, channel: str,
+                        callback: Callable[[str], None]) -> None:
+        self.callbacks.setdefault(channel, []).append(callback)
+
+
+class RedisPubSub(PubSubBase):
+    def __init__(self, cache: Cache) -> None:
+        """Pub/sub over the redis server used by the cache.
+
+        Parameters
+        ----------
+        cache : Cache
+            Redis cache, publishing goes through its pool.
+        """
+
+        self.cache = cache
+        self.connection: aioredis.Redis = None
+        self.tasks: List[asyncio.Task] = []
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self.cache.raw("publish", channel, message)
+
+    async def subscribe(self, channel: str,
+                        callback: Callable[[str], None]) -> None:
+        # Subscribed connections can't run other commands,
+        # so they get their own.
+        if not self.connection:
+            self.connection = await aioredis.create_redis(
+                (self.cache.endpoint, self.cache.port),
+                db=self.cache.db,
+                password=self.cache.password
+            )
+
+        subscribed, = await self.connection.subscribe(channel)
+        self.tasks.append(
+            asyncio.create_task(self._reader(subscribed, callback))
+        )
+
+    async def _reader(self, channel: aioredis.Channel,
+                      callback: Callable[[str], None]) -> None:
+        async for message in channel.iter(encoding="utf-8"):
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("Pub/sub callback failed.")
+
+    async def close(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+
+        if self.connection:
+            self.connection.close()
+            await self.connection.wait_closed()
@@ -0,0 +1,533 @@
+# -*- coding: utf-8 -*-
+
+from itertools import islice
+from time import time
+from typing import Dict, List, Tuple, Union
+from aiocache import Cache
+
+
+# Hash of queue ID to capacity, also lists active queues.
+QUEUES_KEY = "queues"
+# Hash of queue ID to league ID.
+LEAGUES_KEY = "queue-leagues"
+
+
+class QueueState:
+    def __init__(self, queue_id: str, capacity: int, league_id: str,
+                 members: List[Tuple[str, float]]) -> None:
+        """Snapshot of a queue.
+
+        Parameters
+        ----------
+        queue_id : str
+        capacity : int
+        league_id : str
+            League matches are created in.
+        members : List[Tuple[str, float]]
+            User ID & unix time joined, longest waiting first.
+        """
+
+        self.queue_id = queue_id
+        self.capacity = capacity
+        self.league_id = league_id
+        self.members = members
+
+    def api_schema(self, public: bool) -> dict:
+        """Used to get the queue as sent by the API.
+
+        Parameters
+        ----------
+        public : bool
+            If join times should be left out.
+
+        Returns
+        -------
+        dict
+        """
+
+        if public:
+            members = [{"user_id": user_id} for user_id, _ in self.members]
+        else:
+            members = [
+                {"user_id": user_id, "joined": joined}
+                for user_id, joined in self.members
+            ]
+
+        return {
+            "queue_id": self.queue_id,
+            "capacity": self.capacity,
+            "league_id": self.league_id,
+            "size": len(self.members),
+            "members": members
+        }
+
+
+class QueueStoreBase:
+    """Used to hold queue members, shared by every worker
+    when backed by redis. Each operation is atomic.
+    """
+
+    async def create(self, queue_id: str, capacity: int,
+                     league_id: str) -> None:
+        raise NotImplementedError()
+
+    async def get(self, queue_id: str) -> Union[QueueState, None]:
+        """Used to get a queue.
+
+        Parameters
+        ----------
+        queue_id : str
+
+        Returns
+        -------
+        Union[QueueState, None]
+            None if the queue doesn't exist.
+        """
+
+        raise NotImplementedError()
+
+    async def exists(self, queue_id: str) -> bool:
+        raise NotImplementedError()
+
+    async def queue_ids(self) -> List[str]:
+        raise NotImplementedError()
+
+    async def waiting(self, queue_id: str
+                      ) -> Union[Tuple[str, int, int, float], None]:
+        """Used to check a queue without reading every member.
+
+        Parameters
+        ----------
+        queue_id : str
+
+        Returns
+        -------
+        str
+            League ID.
+        int
+            Capacity.
+        int
+            Users waiting.
+        float
+            Unix time the longest waiting user joined.
+        None
+            If the queue doesn't exist or is empty.
+        """
+
+        raise NotImplementedError()
+
+    async def join(self, queue_id: str, user_id: str) -> Union[bool, None]:
+        """Used to add a user to a queue.
+
+        Parameters
+        ----------
+        queue_id : str
+        user_id : str
+
+        Returns
+        -------
+        Union[bool, None]
+            True if in the queue, False if the queue is
+            full & None if the queue doesn't exist.
+
+        Notes
+        -----
+        Joining again keeps the first join time.
+        """
+
+        raise NotImplementedError()
+
+    async def leave(self, queue_id: str, user_id: str) -> bool:
+        """Used to remove a user from a queue.
+
+        Parameters
+        ----------
+        queue_id : str
+        user_id : str
+
+        Returns
+        -------
+        bool
+            If the user was in the queue.
+        """
+
+        raise NotImplementedError()
+
+    async def pop(self, queue_id: str, count: int
+                  ) -> List[Tuple[str, float, int]]:
+        """Used to take the longest waiting users from a queue.
+
+        Parameters
+        ----------
+        queue_id : str
+        count : int
+
+        Returns
+        -------
+        List[Tuple[str, float, int]]
+            User ID, unix time joined & times a match for them
+            failed, empty unless at least count users were waiting.
+        """
+
+        raise NotImplementedError()
+
+    async def restore(self, queue_id: str,
+                      members: List[Tuple[str, float, int]]) -> None:
+        """Used to put popped users back, keeping when they joined.
+
+        Parameters
+        ----------
+        queue_id : str
+        members : List[Tuple[str, float, int]]
+            As given by pop, with their failures counted.
+
+        Notes
+        -----
+        Skips capacity checks, the users were already in the queue.
+        """
+
+        raise NotImplementedError()
+
+    async def delete(self, queue_id: str) -> bool:
+        """Used to end a queue.
+
+        Parameters
+        ----------
+        queue_id : str
+
+        Returns
+        -------
+        bool
+            If the queue existed.
+        """
+
+        raise NotImplementedError()
+
+
+class MemoryQueueStore(QueueStoreBase):
+    def __init__(self) -> None:
+        """In process store, used with the memory cache & for testing.
+        """
+
+        self.capacities: Dict[str, int] = {}
+        self.leagues: Dict[str, str] = {}
+        # User ID to time joined, dicts keep join order.
+        self.members: Dict[str, Dict[str, float]] = {}
+        # User ID to failed matches, only for users with some.
+        self.failures: Dict[str, Dict[str, int]] = {}
+
+    async def create(self, queue_id: str, capacity: int,
+                     league_id: str) -> None:
+        self.capacities[queue_id] = capacity
+        self.leagues[queue_id] = league_id
+        self.members[queue_id] = {}
+        self.failures[queue_id] = {}
+
+    async def get(self, queue_id: str) -> Union[QueueState, None]:
+        if queue_id not in self.capacities:
+            return None
+
+        return QueueState(
+            queue_id, self.capacities[queue_id], self.leagues[queue_id],
+            list(self.members[queue_id].items())
+        )
+
+    async def exists(self, queue_id: str) -> bool:
+        return queue_id in self.capacities
+
+    async def queue_ids(self) -> List[str]:
+        return list(self.capacities)
+
+    async def waiting(self, queue_id: str
+                      ) -> Union[Tuple[str, int, int, float], None]:
+        members = self.members.get(queue_id)
+        if not members:
+            return None
+
+        return (
+            self.leagues[queue_id], self.capacities[queue_id],
+            len(members), members[next(iter(members))]
+        )
+
+    async def join(self, queue_id: str, user_id: str) -> Union[bool, None]:
+        if queue_id not in self.capacities:
+            return None
+
+        members = self.members[queue_id]
+        if user_id in members:
+            return True
+
+        if len(members) >= self.capacities[queue_id]:
+            return False
+
+        members[user_id] = time()
+        return True
+
+    async def leave(self, queue_id: str, user_id: str) -> bool:
+        if queue_id not in self.members:
+            return False
+
+        self.failures[queue_id].pop(user_id, None)
+        return self.members[queue_id].pop(user_id, None) is not None
+
+    async def pop(self, queue_id: str, count: int
+                  ) -> List[Tuple[str, float, int]]:
+        members = self.members.get(queue_id)
+        if not members or len(members) < count:
+            return []
+
+        failures = self.failures[queue_id]
+
+        popped = []
+        for user_id, joined in list(islice(members.items(), count)):
+            del members[user_id]
+            popped.append((user_id, joined, failures.pop(user_id, 0)))
+
+        return popped
+
+    async def restore(self, queue_id: str,
+                      members: List[Tuple[str, float, int]]) -> None:
+        if queue_id not in self.members:
+            return
+
+        queued = self.members[queue_id]
+        failures = self.failures[queue_id]
+        for user_id, joined, failed in members:
+            if user_id not in queued:
+                queued[user_id] = joined
+
+                if failed:
+                    failures[user_id] = failed
+
+        # Keep longest waiting first.
+        self.members[queue_id] = dict(
+            sorted(queued.items(), key=lambda member: member[1])
+        )
+
+    async def delete(self, queue_id: str) -> bool:
+        self.members.pop(queue_id, None)
+        self.failures.pop(queue_id, None)
+        self.leagues.pop(queue_id, None)
+        return self.capacities.pop(queue_id, None) is not None
+
+
+class RedisQueueStore(QueueStoreBase):
+    # KEYS: queues, leagues
+    # ARGV: queue ID, capacity, league ID
+    CREATE_SCRIPT = """
+        redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+        redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+    """
+
+    # KEYS: queues, leagues, members
+    # ARGV: queue ID
+    GET_SCRIPT = """
+        local capacity = redis.call('HGET', KEYS[1], ARGV[1])
+        if not capacity then
+            return nil
+        end
+        return {
+            capacity,
+            redis.call('HGET', KEYS[2], ARGV[1]),
+            redis.call('ZRANGE', KEYS[3], 0, -1, 'WITHSCORES')
+        }
+    """
+
+    # KEYS: queues, leagues, members
+    # ARGV: queue ID
+    WAITING_SCRIPT = """
+        local capacity = redis.call('HGET', KEYS[1], ARGV[1])
+        local league_id = redis.call('HGET', KEYS[2], ARGV[1])
+        local longest = redis.call('ZRANGE', KEYS[3], 0, 0, 'WITHSCORES')
+        if not capacity or not league_id or #longest == 0 then
+            return nil
+        end
+        return {
+            league_id, capacity, redis.call('ZCARD', KEYS[3]), longest[2]
+        }
+    """
+
+    # KEYS: queues, members
+    # ARGV: queue ID, user ID, time joined
+    JOIN_SCRIPT = """
+        local capacity = redis.call('HGET', KEYS[1], ARGV[1])
+        if not capacity then
+            return -1
+        end
+        if redis.call('ZSCORE', KEYS[2], ARGV[2]) then
+            return 1
+        end
+        if redis.call('ZCARD', KEYS[2]) >= tonumber(capacity) then
+            return 0
+        end
+        redis.call('ZADD', KEYS[2], ARGV[3], ARGV[2])
+        return 1
+    """
+
+    # KEYS: members, failures
+    # ARGV: user ID
+    LEAVE_SCRIPT = """
+        redis.call('HDEL', KEYS[2], ARGV[1])
+        return redis.call('ZREM', KEYS[1], ARGV[1])
+    """
+
+    # KEYS: members, failures
+    # ARGV: count
+    POP_SCRIPT = """
+        local count = tonumber(ARGV[1])
+        if redis.call('ZCARD', KEYS[1]) < count then
+            return {}
+        end
+        local popped = redis.call('ZRANGE', KEYS[1], 0, count - 1,
+                                  'WITHSCORES')
+        redis.call('ZREMRANGEBYRANK', KEYS[1], 0, count - 1)
+        local members = {}
+        for index = 1, #popped, 2 do
+            members[#members + 1] = popped[index]
+            members[#members + 1] = popped[index + 1]
+            members[#members + 1] = redis.call(
+                'HGET', KEYS[2], popped[index]
+            ) or '0'
+            redis.call('HDEL', KEYS[2], popped[index])
+        end
+        return members
+    """
+
+    # KEYS: queues, members, failures
+    # ARGV: queue ID, user ID, time joined & failures triples
+    RESTORE_SCRIPT = """
+        if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+            return 0
+        end
+        for index = 2, #ARGV, 3 do
+            local added = redis.call(
+                'ZADD', KEYS[2], 'NX', ARGV[index + 1], ARGV[index]
+            )
+            if added == 1 and ARGV[index + 2] ~= '0' then
+                redis.call('HSET', KEYS[3], ARGV[index], ARGV[index + 2])
+            end
+        end
+        return 1
+    """
+
+    # KEYS: queues, leagues, members, failures
+    # ARGV: queue ID
+    DELETE_SCRIPT = """
+        redis.call('DEL', KEYS[3], KEYS[4])
+        redis.call('HDEL', KEYS[2], ARGV[1])
+        return redis.call('HDEL', KEYS[1], ARGV[1])
+    """
+
+    def __init__(self, cache: Cache) -> None:
+        """Store shared by every worker, members are held
+        in a sorted set scored by the time they joined.
+
+        Parameters
+        ----------
+        cache : Cache
+            Redis cache.
+        """
+
+        self.cache = cache
+
+    @staticmethod
+    def _members_key(queue_id: str) -> str:
+        return "queue-" + queue_id
+
+    @staticmethod
+    def _failures_key(queue_id: str) -> str:
+        return "queue-failures-" + queue_id
+
+    @staticmethod
+    def _pairs(reply: List[str]) -> List[Tuple[str, float]]:
+        return [
+            (reply[index], float(reply[index + 1]))
+            for index in range(0, len(reply), 2)
+        ]
+
+    async def create(self, queue_id: str, capacity: int,
+                     league_id: str) -> None:
+        await self.cache.raw(
+            "eval", self.CREATE_SCRIPT, [QUEUES_KEY, LEAGUES_KEY],
+            [queue_id, capacity, league_id]
+        )
+
+    async def get(self, queue_id: str) -> Union[QueueState, None]:
+        reply = await self.cache.raw(
+            "eval", self.GET_SCRIPT,
+            [QUEUES_KEY, LEAGUES_KEY, self._members_key(queue_id)],
+            [queue_id]
+        )
+        if reply is None:
+            return None
+
+        return QueueState(
+            queue_id, int(reply[0]), reply[1], self._pairs(reply[2])
+        )
+
+    async def exists(self, queue_id: str) -> bool:
+        return bool(await self.cache.raw("hexists", QUEUES_KEY, queue_id))
+
+    async def queue_ids(self) -> List[str]:
+        return await self.cache.raw("hkeys", QUEUES_KEY)
+
+    async def waiting(self, queue_id: str
+                      ) -> Union[Tuple[str, int, int, float], None]:
+        reply = await self.cache.raw(
+            "eval", self.WAITING_SCRIPT,
+            [QUEUES_KEY, LEAGUES_KEY, self._members_key(queue_id)],
+            [queue_id]
+        )
+        if reply is None:
+            return None
+
+        return reply[0], int(reply[1]), reply[2], float(reply[3])
+
+    async def join(self, queue_id: str, user_id: str) -> Union[bool, None]:
+        joined = await self.cache.raw(
+            "eval", self.JOIN_SCRIPT,
+            [QUEUES_KEY, self._members_key(queue_id)],
+            [queue_id, user_id, repr(time())]
+        )
+
+        return None if joined == -1 else joined == 1
+
+    async def leave(self, queue_id: str, user_id: str) -> bool:
+        return bool(await self.cache.raw(
+            "eval", self.LEAVE_SCRIPT,
+            [self._members_key(queue_id), self._failures_key(queue_id)],
+            [user_id]
+        ))
+
+    async def pop(self, queue_id: str, count: int
+                  ) -> List[Tuple[str, float, int]]:
+        reply = await self.cache.raw(
+            "eval", self.POP_SCRIPT,
+            [self._members_key(queue_id), self._failures_key(queue_id)],
+            [count]
+        )
+
+        return [
+            (reply[index], float(reply[index + 1]), int(reply[index + 2]))
+            for index in range(0, len(reply), 3)
+        ]
+
+    async def restore(self, queue_id: str,
+                      members: List[Tuple[str, float, int]]) -> None:
+        args = [queue_id]
+        for user_id, joined, failures in members:
+            args += [user_id, repr(joined), failures]
+
+        await self.cache.raw(
+            "eval", self.RESTORE_SCRIPT,
+            [QUEUES_KEY, self._members_key(queue_id),
+             self._failures_key(queue_id)], args
+        )
+
+    async def delete(self, queue_id: str) -> bool:
+        return bool(await self.cache.raw(
+            "eval", self.DELETE_SCRIPT,
+            [QUEUES_KEY, LEAGUES_KEY, self._members_key(queue_id),
+             self._failures_key(queue_id)],
+            [queue_id]
+        ))
@@ -5,7 +5,6 @@ import aiohttp
 import proxycheck
 
 from OpenQueue import OpenQueue
-from OpenQueue.queue import Queue
 from OpenQueue.settings.upload import B2Settings, PfpSettings
 from OpenQueue.settings.webhook import WebhookSettings
 
@@ -16,8 +15,17 @@ from aioauth_client import DiscordClient
 from .settings.discord import DiscordSettings
 from .settings.proxy_check import ProxyCheckSettings
 from .settings.api import ApiSettings
+from .settings.cache import CacheSettings
+from .settings.matchmaking import MatchmakingSettings
 
 from .login import LoginTokens
+from .local_cache import LocalCache
+from .pubsub import PubSubBase
+from .feed import MatchFeedBase
+from .scopes import ScopeRegistry
+from .proxy_lookup import ProxyLookup
+from .queue_store import QueueStoreBase
+from .broadcast import ScoreboardBroadcaster
 
 
 class Sessions:
@@ -25,8 +33,14 @@ class Sessions:
     database: Database
     requests: aiohttp.ClientSession
     cache: Cache
+    pubsub: PubSubBase
+    local_caches: Dict[str, LocalCache] = {}
+    match_feed: MatchFeedBase
+    scoreboards: ScoreboardBroadcaster
+    scopes: ScopeRegistry
     discord_auth: DiscordClient
     proxy: proxycheck.Awaiting
+    proxy_lookup: ProxyLookup
     login_token: LoginTokens
 
 
@@ -39,7 +53,9 @@ class Config:
     b2: B2Settings
     pfp: PfpSettings
     webhooks: WebhookSettings
+    cache: CacheSettings
+    matchmaking: MatchmakingSettings
 
 
 class Queues:
-    active: Dict[str, Queue] = {}
+    active: QueueStoreBase
@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 
-from starlette.routing import Route, Mount
+from starlette.routing import Route, Mount, WebSocketRoute
 
 from webargs_starlette import WebargsHTTPException
 from starlette.exceptions import HTTPException
 from OpenQueue.exceptions import OpenQueueException, UsersBanned
 
+from ..exceptions import SkrimAPIException
+
 
 # Metrics
 from starlette_prometheus import metrics
@@ -24,20 +26,30 @@ from .api.v1.league.user import (
     LeagueUserBanAPI,
     LeagueUserMatchesAPI
 )
-from .api.v1.league.users import LeagueUsersAPI
+from .api.v1.league.users import LeagueUsersAPI, LeagueUsersBulkAPI
 from .api.v1.league.match import (
     LeagueMatchCreateAPI,
+    LeagueMatchBatchAPI,
     LeagueMatchAPI,
-    LeagueMatchScoreboardAPI
+    LeagueMatchScoreboardAPI,
+    LeagueMatchScoreboardLiveAPI
+)
+from .api.v1.league.matches import (
+    LeagueMatchesAPI,
+    LeagueMatchesBulkAPI,
+    LeagueMatchesLiveAPI
 )
-from .api.v1.league.matches import LeagueMatchesAPI
+from .api.v1.league.queue import QueueAPI
 
 # Integrations
 from .api.v1.integrations import IntegrationsAPI
 from .api.v1.league.integrations import LeagueIntegrationsAPI
 
+# Live scoreboards
+from .live import live_socket
+
 # Caching Route
-from .caching import CachingRoute
+from .caching import CachingRoute, CachingBatchRoute
 
 # Error handlers
 from .errors import (
@@ -65,6 +77,7 @@ from .auth.login import GenerateLoginToken, UserToken, LoginRedirect
 ERROR_HANDLERS = {
     UsersBanned: error,
     OpenQueueException: error,
+    SkrimAPIException: error,
     WebargsHTTPException: payload_error,
     HTTPException: server_error
 }
@@ -84,19 +97,28 @@ ROUTES = [
                     Route("/matches/", LeagueUserMatchesAPI)
                 ]),
                 Mount("/users", routes=[
-                    Route("/", LeagueUsersAPI)
+                    Route("/", LeagueUsersAPI),
+                    Route("/bulk/", LeagueUsersBulkAPI)
                 ]),
                 Mount("/match", routes=[
                     Route(
                         "/{map_selection}/{player_selection}/{captain_selection}/",  # noqa: E501
                         LeagueMatchCreateAPI
                     ),
+                    Route("/batch/", LeagueMatchBatchAPI),
                     Route("/scoreboard/", LeagueMatchScoreboardAPI),
+                    Route(
+                        "/scoreboard/live/", LeagueMatchScoreboardLiveAPI
+                    ),
                     Route("/", LeagueMatchAPI)
                 ]),
                 Mount("/matches", routes=[
-                    Route("/", LeagueMatchesAPI)
-                ])
+                    Route("/", LeagueMatchesAPI),
+                    Route("/bulk/", LeagueMatchesBulkAPI),
+                    Route("/live/", LeagueMatchesLiveAPI)
+                ]),
+                WebSocketRoute("/live/", live_socket),
+                Route("/queue/", QueueAPI)
             ]),
         ]),
         Mount("/auth", routes=[
@@ -115,7 +137,10 @@ ROUTES = [
             Route("/login/", LoginRedirect),
             Route("/user/", UserToken),
         ]),
-        Route("/caching/", CachingRoute),
+        Mount("/caching", routes=[
+            Route("/", CachingRoute),
+            Route("/batch/", CachingBatchRoute)
+        ]),
         Route("/metrics/", metrics),
     ]),
 ]
@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+import logging
+import numpy as np
+
+from time import perf_counter
+from typing import Dict, List, Union
+
 from starlette.endpoints import HTTPEndpoint
 from starlette.requests import Request
 from starlette.authentication import requires
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
 
 from marshmallow import Schema, validate
 from webargs import fields
@@ -12,13 +19,30 @@ from webargs_starlette import use_args
 from OpenQueue.league import League
 from OpenQueue.settings.match import MatchSettings
 
-from ....response import response, error_response
+from ....response import (
+    response,
+    cached_response,
+    error_response,
+    precondition_response
+)
 from ....decorators import required_states
 
+from ....live import live_response
+
 from .....caching import (
     CacheScoreboard,
     CacheMatch
 )
+from .....balancing import balance
+from .....delta import apply_delta, IncompletePlayer
+from .....encoders import json_loads
+from .....resources import Sessions
+
+
+logger = logging.getLogger("SkrimAPI")
+
+# Matches a batch creates at once.
+BATCH_CONCURRENCY = 16
 
 
 class TeamSchema(Schema):
@@ -49,6 +73,30 @@ MATCH_FIELDS = {
 }
 
 
+class RatedPlayerSchema(Schema):
+    user_id = fields.String(min=36, max=36, required=True)
+    elo = fields.Float(required=True)
+
+
+BATCH_FIELDS = {
+    "players": fields.List(
+        fields.Nested(RatedPlayerSchema),
+        required=True,
+        validate=validate.Length(2, 10000)
+    ),
+    "team_size": fields.Integer(
+        required=True, validate=validate.Range(1, 15)
+    ),
+    "maps": MATCH_FIELDS["maps"],
+    "team_1_name": fields.String(missing="Team 1", max=64),
+    "team_2_name": fields.String(missing="Team 2", max=64),
+    "connection_time": MATCH_FIELDS["connection_time"],
+    "knife_round": MATCH_FIELDS["knife_round"],
+    "wait_for_spectators": MATCH_FIELDS["wait_for_spectators"],
+    "warmup_time": MATCH_FIELDS["warmup_time"]
+}
+
+
 class PlayersSchema(Schema):
     name = fields.String(min=1, max=42, required=True)
     user_id = fields.String(min=36, max=36, required=True)
@@ -68,6 +116,49 @@ class PlayersSchema(Schema):
     team_kills = fields.Int(required=True)
 
 
+PLAYER_FIELDS = tuple(PlayersSchema().fields)
+
+# Fields match.update always needs.
+UPDATE_FIELDS = ("team_1_score", "team_2_score", "team_1_side",
+                 "team_2_side")
+
+
+class PlayerDeltaSchema(Schema):
+    """PlayersSchema with only user_id required.
+    """
+
+    name = fields.String(min=1, max=42)
+    user_id = fields.String(min=36, max=36, required=True)
+    team = fields.Int()
+    alive = fields.Bool()
+    ping = fields.Int()
+    kills = fields.Int()
+    headshots = fields.Int()
+    assists = fields.Int()
+    deaths = fields.Int()
+    shots_fired = fields.Int()
+    shots_hit = fields.Int()
+    mvps = fields.Int()
+    score = fields.Int()
+    disconnected = fields.Bool()
+    team_blinds = fields.Int()
+    team_kills = fields.Int()
+
+
+DELTA_FIELDS = {
+    "team_1_score": fields.Int(validate=validate.Range(0, 640)),
+    "team_2_score": fields.Int(validate=validate.Range(0, 640)),
+    "team_1_side": fields.Int(validate=validate.Range(0, 1)),
+    "team_2_side": fields.Int(validate=validate.Range(0, 1)),
+    "team_1_name": fields.String(validate=validate.Length(1, 64)),
+    "team_2_name": fields.String(validate=validate.Length(1, 64)),
+    "players": fields.List(
+        fields.Nested(PlayerDeltaSchema),
+        validate=validate.Length(1, 30)
+    )
+}
+
+
 class LeagueMatchCreateAPI(HTTPEndpoint):
     @use_args(MATCH_FIELDS)
     @requires("league.create_match")
@@ -155,7 +246,127 @@ class LeagueMatchCreateAPI(HTTPEndpoint):
         ))
 
 
+class LeagueMatchBatchAPI(HTTPEndpoint):
+    @use_args(BATCH_FIELDS)
+    @requires("league.create_match")
+    @required_states("league")
+    async def post(self, request: Request, paramters: dict) -> JSONResponse:
+        """Used to split a pool of players into
+        balanced matches & create them.
+
+        Parameters
+        ----------
+        request : Request
+        paramters : dict
+
+        Returns
+        -------
+        response
+            Matches in order of rating, null for ones which
+            failed, with balance & seconds taken.
+
+        Notes
+        -----
+        Lobbies are players of similar rating, teams are
+        balanced by their given ELO. The lowest rated
+        players which don't fill a lobby are left over.
+        """
+
+        league: League = request.state.league
+        public_schema = request.state.public_schema["league.create_match"]
+        players = paramters["players"]
+
+        if len({player["user_id"] for player in players}) != len(players):
+            return error_response(
+                "Players given more than once", status_code=400
+            )
+
+        started = perf_counter()
+
+        ratings = np.fromiter(
+            (player["elo"] for player in players),
+            dtype=np.float64, count=len(players)
+        )
+        team_1, team_2, difference, left_over = balance(
+            ratings, paramters["team_size"]
+        )
+
+        balanced = perf_counter()
+
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        def user_ids(indexes: np.ndarray) -> List[str]:
+            return [players[index]["user_id"] for index in indexes.tolist()]
+
+        def captain(team: np.ndarray) -> str:
+            # Highest rated of the team.
+            return players[int(team[ratings[team].argmax()])]["user_id"]
+
+        async def create(team_1: np.ndarray, team_2: np.ndarray
+                         ) -> Union[dict, None]:
+            async with semaphore:
+                try:
+                    match_settings = MatchSettings(
+                        team_1_name=paramters["team_1_name"],
+                        team_2_name=paramters["team_2_name"],
+                        connection_time=paramters["connection_time"],
+                        knife_round=paramters["knife_round"],
+                        wait_for_spectators=paramters["wait_for_spectators"],
+                        warmup_time=paramters["warmup_time"]
+                    )
+
+                    match_settings.maps(paramters["maps"]).random()
+                    await match_settings.players().given(
+                        team_1=user_ids(team_1), team_2=user_ids(team_2)
+                    )
+                    match_settings.captains().given(
+                        captain_1=captain(team_1), captain_2=captain(team_2)
+                    )
+
+                    scoreboard, _, _ = await league.create_match(
+                        match_settings
+                    )
+                except Exception:
+                    # One lobby failing shouldn't fail the rest.
+                    logger.exception(
+                        "Creating batch match for league %s failed",
+                        league.league_id
+                    )
+                    return None
+
+            return scoreboard.api_schema(public_schema)
+
+        matches = await asyncio.gather(*[
+            create(team_1[lobby], team_2[lobby])
+            for lobby in range(len(team_1))
+        ])
+
+        created = perf_counter()
+
+        return response({
+            "matches": matches,
+            "balance": {
+                "differences": difference.tolist(),
+                "mean_difference": (
+                    float(difference.mean()) if len(difference) else 0.0
+                ),
+                "max_difference": (
+                    float(difference.max()) if len(difference) else 0.0
+                ),
+                "left_over": user_ids(left_over)
+            },
+            "timings": {
+                "balance": balanced - started,
+                "create": created - balanced
+            }
+        })
+
+
 class LeagueMatchAPI(HTTPEndpoint):
+    # Scoreboard key to lock & requests using it, so deltas for a
+    # match on this worker don't fail each other's swaps.
+    updating: Dict[str, list] = {}
+
     @requires("league.match")
     @required_states("match")
     async def get(self, request: Request) -> JSONResponse:
@@ -173,13 +384,20 @@ class LeagueMatchAPI(HTTPEndpoint):
         match = request.state.match
         public_schema = request.state.public_schema["league.match"]
 
+        # Only the public schema is cached.
+        if not public_schema:
+            return response((await match.get()).api_schema(public_schema))
+
         cache = CacheMatch(match.upper.league_id, match.match_id)
 
-        cache_get = await cache.get()
-        if cache_get:
-            return response(cache_get)
+        async def load() -> dict:
+            return (await match.get()).api_schema(True)
+
+        cached = await cache.get_response(load)
+        if cached is None:
+            cached = await cache.load_response(load)
 
-        return response((await match.get()).api_schema(public_schema))
+        return cached_response(request, *cached)
 
     @use_args({"team_1_score": fields.Int(
                 required=True, validates=validate.Range(0, 640)
@@ -221,6 +439,99 @@ class LeagueMatchAPI(HTTPEndpoint):
 
         return response((await match.scoreboard()).api_schema(public_schema))
 
+    @use_args(DELTA_FIELDS)
+    @requires("league.match.update")
+    @required_states("match")
+    async def patch(self, request: Request, paramters: dict
+                    ) -> JSONResponse:
+        """Used to update a match with only what changed.
+
+        Parameters
+        ----------
+        request : Request
+        paramters : dict
+
+        Returns
+        -------
+        response
+            New scoreboard ETag in the ETag header.
+
+        Notes
+        -----
+        If-Match must be the ETag of the scoreboard the delta was
+        made from, 412 is returned with the current ETag if it's
+        changed since. ETags are revisions which only go up, so a
+        scoreboard changed back still has a new ETag. Only players
+        which changed are written.
+        """
+
+        match = request.state.match
+        league_id, match_id = match.upper.league_id, match.match_id
+
+        cache = CacheScoreboard(league_id, match_id)
+
+        async def load() -> dict:
+            return (await match.scoreboard()).api_schema(True)
+
+        entry = LeagueMatchAPI.updating.setdefault(
+            cache.key, [asyncio.Lock(), 0]
+        )
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                cached = await cache.get_response()
+                if cached is None:
+                    cached = await cache.load_response(load)
+
+                etag, body = cached
+
+                failed = precondition_response(request, etag)
+                if failed:
+                    return failed
+
+                try:
+                    scoreboard, changes = apply_delta(
+                        json_loads(body)["data"], paramters, PLAYER_FIELDS
+                    )
+                except IncompletePlayer as error:
+                    return error_response(
+                        "Every field needed for new player {}".format(
+                            error.user_id
+                        ), status_code=400
+                    )
+
+                if not changes:
+                    return response(headers={"ETag": etag})
+
+                # Only stored if no other worker changed it since.
+                etag = await cache.swap(scoreboard, etag)
+                if etag is None:
+                    current = await cache.get_response()
+                    return error_response(
+                        "Scoreboard changed", status_code=412,
+                        headers={"ETag": current[0]} if current else None
+                    )
+
+                update = {
+                    field: scoreboard[field] for field in UPDATE_FIELDS
+                    if field in scoreboard
+                }
+                update.update(changes)
+                try:
+                    await match.update(**update)
+                except Exception:
+                    # Cached scoreboard is ahead of the database.
+                    await cache.delete()
+                    raise
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                LeagueMatchAPI.updating.pop(cache.key, None)
+
+        await Sessions.scoreboards.publish(league_id, match_id, scoreboard)
+
+        return response(headers={"ETag": etag})
+
     @requires("league.match.end")
     @required_states("match")
     async def delete(self, request: Request) -> JSONResponse:
@@ -259,10 +570,40 @@ class LeagueMatchScoreboardAPI(HTTPEndpoint):
         match = request.state.match
         public_schema = request.state.public_schema["league.match.scoreboard"]
 
+        # Only the public schema is cached.
+        if not public_schema:
+            return response(
+                (await match.scoreboard()).api_schema(public_schema)
+            )
+
         cache = CacheScoreboard(match.upper.league_id, match.match_id)
 
-        cache_get = await cache.get()
-        if cache_get:
-            return response(cache_get)
+        async def load() -> dict:
+            return (await match.scoreboard()).api_schema(True)
 
-        return response((await match.scoreboard()).api_schema(public_schema))
+        cached = await cache.get_response(load)
+        if cached is None:
+            cached = await cache.load_response(load)
+
+        return cached_response(request, *cached)
+
+
+class LeagueMatchScoreboardLiveAPI(HTTPEndpoint):
+    @requires("league.match.scoreboard")
+    @required_states("match")
+    async def get(self, request: Request) -> StreamingResponse:
+        """Used to stream a match's scoreboard as it changes.
+
+        Parameters
+        ----------
+        request : Request
+
+        Returns
+        -------
+        StreamingResponse
+            Server sent events.
+        """
+
+        match = request.state.match
+
+        return live_response(match.upper.league_id, match.match_id)
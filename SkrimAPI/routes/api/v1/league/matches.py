@@ -1,25 +1,89 @@
 # -*- coding: utf-8 -*-
 
+from typing import Dict, List, Union
+from sqlalchemy.sql import Select, select, or_
 from starlette.endpoints import HTTPEndpoint
 from starlette.requests import Request
 from starlette.authentication import requires
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
+from marshmallow import validate
 from webargs import fields
 from webargs_starlette import use_args
 
-from ....response import response
+from OpenQueue.tables import scoreboard_total_table
+from OpenQueue.models.match import MatchModel
+
+from ....response import (
+    page_response,
+    encoded_page_response,
+    error_response
+)
 from ....decorators import required_states
+from ....live import live_response
+from ....bulk import bulk_response, BULK_MAX
+from ....cursor import feed_cursor, decode_feed_cursor, KeysetPage
+
+from .....resources import Config, Sessions
+from .....caching import CacheMatch
+
+
+def matches_query(league_id: str, search: str = None) -> Select:
+    """Used to select matches of a league.
+
+    Parameters
+    ----------
+    league_id : str
+    search : str, optional
+        Part of either team's name, by default None
+
+    Returns
+    -------
+    Select
+    """
+
+    query = select([scoreboard_total_table]).where(
+        scoreboard_total_table.c.league_id == league_id
+    )
+
+    if search:
+        query = query.where(or_(
+            scoreboard_total_table.c.team_1_name.ilike("%" + search + "%"),
+            scoreboard_total_table.c.team_2_name.ilike("%" + search + "%")
+        ))
+
+    return query
+
+
+async def matches_page(query: Select, page: KeysetPage,
+                       public_schema: bool) -> List[dict]:
+    """Used to read a page of matches, newest first unless desc is false.
+
+    Parameters
+    ----------
+    query : Select
+    page : KeysetPage
+    public_schema : bool
+
+    Returns
+    -------
+    List[dict]
+    """
 
-from .....caching import CacheMatches
+    return [
+        MatchModel(**row).api_schema(public_schema)
+        async for row in page.rows(query, scoreboard_total_table.c.timestamp,
+                                   scoreboard_total_table.c.match_id)
+    ]
 
 
 class LeagueMatchesAPI(HTTPEndpoint):
-    @use_args({"search": fields.Str(), "page": fields.Int(),
-               "desc": fields.Bool()})
+    @use_args({"search": fields.Str(), "desc": fields.Bool(),
+               "cursor": fields.Str()})
     @requires("league.matches")
     @required_states("league")
-    async def post(self, request: Request, paramters: dict) -> JSONResponse:
+    async def post(self, request: Request, paramters: dict
+                   ) -> Union[JSONResponse, Response]:
         """Lists matches for a league.
 
         Parameters
@@ -30,17 +94,110 @@ class LeagueMatchesAPI(HTTPEndpoint):
         Returns
         -------
         response
+
+        Notes
+        -----
+        Unfiltered lists are paged through the match feed by
+        position, filtered lists through the database by the
+        time & ID of the last match given. Feed cursors can't
+        be given with search or desc.
+        """
+
+        league = request.state.league
+        public_schema = request.state.public_schema["league.matches"]
+
+        after = None
+        if "cursor" in paramters:
+            try:
+                after = decode_feed_cursor(paramters["cursor"])
+            except ValueError:
+                pass
+
+        if after and ("search" in paramters or "desc" in paramters):
+            return error_response(
+                "Cursor is for unfiltered matches", status_code=400
+            )
+
+        if paramters and not after:
+            try:
+                page = KeysetPage(paramters, Config.api.page_size)
+            except ValueError:
+                return error_response("Invalid cursor", status_code=400)
+
+            data = await matches_page(
+                matches_query(league.league_id, page.search), page,
+                public_schema
+            )
+
+            return page_response(request, data, page.next_cursor())
+
+        rows = await Sessions.match_feed.page(
+            league.league_id, after, Config.cache.match_feed_page
+        )
+
+        return encoded_page_response(
+            request, [match for _, _, match in rows],
+            feed_cursor(*rows[-1][:2])
+            if len(rows) == Config.cache.match_feed_page else None
+        )
+
+
+class LeagueMatchesBulkAPI(HTTPEndpoint):
+    @use_args({"match_ids": fields.List(
+        fields.String(validate=validate.Length(max=36)),
+        required=True,
+        validate=validate.Length(1, BULK_MAX)
+    )})
+    @requires("league.matches")
+    @required_states("league")
+    async def post(self, request: Request, paramters: dict) -> Response:
+        """Used to get many matches of a league at once.
+
+        Parameters
+        ----------
+        request : Request
+        paramters : dict
+
+        Returns
+        -------
+        response
+            Matches in the order given, null if not found.
         """
 
         league = request.state.league
         public_schema = request.state.public_schema["league.matches"]
 
-        if paramters:
-            data = [
-                match.api_schema(public_schema)
-                async for match, _ in league.matches(**paramters)
-            ]
-        else:
-            data = await CacheMatches(league.league_id).get()
+        async def load(match_ids: List[str]) -> Dict[str, MatchModel]:
+            query = matches_query(league.league_id).where(
+                scoreboard_total_table.c.match_id.in_(match_ids)
+            )
+
+            return {
+                row["match_id"]: MatchModel(**row)
+                async for row in Sessions.database.iterate(query)
+            }
+
+        return await bulk_response(
+            [CacheMatch(league.league_id, match_id)
+             for match_id in paramters["match_ids"]],
+            paramters["match_ids"], load, public_schema
+        )
+
+
+class LeagueMatchesLiveAPI(HTTPEndpoint):
+    @requires("league.matches")
+    @required_states("league")
+    async def get(self, request: Request) -> StreamingResponse:
+        """Used to stream scoreboards of every match in a league.
+
+        Parameters
+        ----------
+        request : Request
+
+        Returns
+        -------
+        StreamingResponse
+            Server sent events.
+        """
 
-        return response(data)
+        return live_response(request.state.league.league_id)
@@ -1,17 +1,69 @@
 # -*- coding: utf-8 -*-
 
+from secrets import token_urlsafe
+from typing import Union
+
 from starlette.endpoints import HTTPEndpoint
 from starlette.authentication import requires
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
+from marshmallow import validate
 from webargs import fields
 from webargs_starlette import use_args
 
 from ....response import response
 from ....decorators import required_states
 
-from .....resources import Sessions
+from .....resources import Queues
+from .....queue_store import QueueState
+from .....exceptions import QueueNotFound, QueueFull
+
+
+def caller_league(request: Request) -> Union[str, None]:
+    """Used to get the league of the caller.
+
+    Parameters
+    ----------
+    request : Request
+
+    Returns
+    -------
+    Union[str, None]
+        None for site users not viewing a league, who
+        only join & leave queues as themselves.
+    """
+
+    league = getattr(request.state, "league", None)
+    return league.league_id if league else None
+
+
+async def get_queue(queue_id: str, league_id: Union[str, None]
+                    ) -> QueueState:
+    """Used to get a queue or raise.
+
+    Parameters
+    ----------
+    queue_id : str
+    league_id : Union[str, None]
+        League of the caller, queues of other leagues
+        aren't found. None to not check.
+
+    Returns
+    -------
+    QueueState
+
+    Raises
+    ------
+    QueueNotFound
+    """
+
+    queue = await Queues.active.get(queue_id)
+    if queue is None or (league_id is not None
+                         and queue.league_id != league_id):
+        raise QueueNotFound()
+
+    return queue
 
 
 class QueueAPI(HTTPEndpoint):
@@ -29,13 +81,16 @@ class QueueAPI(HTTPEndpoint):
         response
         """
 
-        queue = request.state.queue
+        queue = await get_queue(request.state.queue, caller_league(request))
         public_schema = request.state.public_schema["queue.get"]
 
-        return response((queue.get()).api_schema(public_schema))
+        return response(queue.api_schema(public_schema))
 
-    @use_args({"capacity": fields.Integer()})
+    @use_args({"capacity": fields.Integer(
+        required=True, validate=validate.Range(min=1)
+    )})
     @requires("create_queue")
+    @required_states("league")
     async def post(self, request: Request, paramters: dict) -> JSONResponse:
         """Used to create a queue.
 
@@ -51,11 +106,13 @@ class QueueAPI(HTTPEndpoint):
 
         public_schema = request.state.public_schema["create_queue"]
 
-        queue = Sessions.base.create_queue(**paramters)
-        queue.active[queue.queue_id] = queue
+        league_id = request.state.league.league_id
+
+        queue_id = token_urlsafe(16)
+        await Queues.active.create(queue_id, paramters["capacity"], league_id)
 
         return response((
-            queue.get()
+            await get_queue(queue_id, league_id)
         ).api_schema(public_schema))
 
     @requires("queue.user.join")
@@ -72,13 +129,22 @@ class QueueAPI(HTTPEndpoint):
         response
         """
 
-        queue = request.state.queue
+        queue_id = request.state.queue
+        league_id = caller_league(request)
         public_schema = request.state.public_schema["queue.user.join"]
 
-        await queue.join(request.state.user)
+        await get_queue(queue_id, league_id)
+
+        joined = await Queues.active.join(
+            queue_id, request.state.user.user_id
+        )
+        if joined is None:
+            raise QueueNotFound()
+        if not joined:
+            raise QueueFull()
 
         return response((
-            queue.get()
+            await get_queue(queue_id, league_id)
         ).api_schema(public_schema))
 
     @requires("queue.user.leave")
@@ -95,13 +161,16 @@ class QueueAPI(HTTPEndpoint):
         response
         """
 
-        queue = request.state.queue
+        queue_id = request.state.queue
+        league_id = caller_league(request)
         public_schema = request.state.public_schema["queue.user.leave"]
 
-        queue.leave(request.state.user)
+        await get_queue(queue_id, league_id)
+
+        await Queues.active.leave(queue_id, request.state.user.user_id)
 
         return response((
-            queue.get()
+            await get_queue(queue_id, league_id)
         ).api_schema(public_schema))
 
     @requires("queue.end")
@@ -118,6 +187,11 @@ class QueueAPI(HTTPEndpoint):
         response
         """
 
-        queue = request.state.queue
-        queue.active.pop(queue.queue_id, None)
+        queue_id = request.state.queue
+
+        await get_queue(queue_id, caller_league(request))
+
+        if not await Queues.active.delete(queue_id):
+            raise QueueNotFound()
+
         return response()
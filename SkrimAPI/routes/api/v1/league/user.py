@@ -1,19 +1,30 @@
 # -*- coding: utf-8 -*-
 
+from typing import Union
 from starlette.endpoints import HTTPEndpoint
 from starlette.requests import Request
 from starlette.authentication import requires
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from OpenQueue.settings.ban import BanSettings
+from OpenQueue.tables import scoreboard_table, scoreboard_total_table
 
 from webargs import fields
 from webargs_starlette import use_args
 
-from ....response import response
+from ....response import (
+    response,
+    cached_response,
+    page_response,
+    error_response
+)
 from ....decorators import required_states
+from ....cursor import KeysetPage
 
 from .....caching import CacheUser
+from .....resources import Config
+
+from .matches import matches_query, matches_page
 
 
 class LeagueUserAPI(HTTPEndpoint):
@@ -34,23 +45,31 @@ class LeagueUserAPI(HTTPEndpoint):
         user = request.state.user
         public_schema = request.state.public_schema["league.user"]
 
+        # Only the public schema is cached.
+        if not public_schema:
+            return response((await user.get()).api_schema(public_schema))
+
         cache = CacheUser(
             user.upper.league_id, user.user_id
         )
 
-        cache_get = await cache.get()
-        if cache_get:
-            return response(cache_get)
+        async def load() -> dict:
+            return (await user.get()).api_schema(True)
 
-        return response((await user.get()).api_schema(public_schema))
+        cached = await cache.get_response(load)
+        if cached is None:
+            cached = await cache.load_response(load)
+
+        return cached_response(request, *cached)
 
 
 class LeagueUserMatchesAPI(HTTPEndpoint):
-    @use_args({"search": fields.Str(), "page": fields.Int(),
-               "desc": fields.Bool()})
+    @use_args({"search": fields.Str(), "desc": fields.Bool(),
+               "cursor": fields.Str()})
     @requires("league.user.matches")
     @required_states("user")
-    async def post(self, request: Request, paramters: dict) -> JSONResponse:
+    async def post(self, request: Request, paramters: dict
+                   ) -> Union[JSONResponse, Response]:
         """Used to get User matches within league context.
 
         Parameters
@@ -66,10 +85,22 @@ class LeagueUserMatchesAPI(HTTPEndpoint):
         user = request.state.user
         public_schema = request.state.public_schema["league.user.matches"]
 
-        return response([
-            match.api_schema(public_schema)
-            async for match, _ in user.matches(**paramters)
-        ])
+        try:
+            page = KeysetPage(paramters, Config.api.page_size)
+        except ValueError:
+            return error_response("Invalid cursor", status_code=400)
+
+        query = matches_query(user.upper.league_id, page.search).select_from(
+            scoreboard_total_table.join(
+                scoreboard_table,
+                scoreboard_table.c.match_id
+                == scoreboard_total_table.c.match_id
+            )
+        ).where(scoreboard_table.c.user_id == user.user_id)
+
+        data = await matches_page(query, page, public_schema)
+
+        return page_response(request, data, page.next_cursor())
 
 
 class LeagueUserBanAPI(HTTPEndpoint):
@@ -1,23 +1,60 @@
 # -*- coding: utf-8 -*-
 
+from typing import Dict, List, Union
+from sqlalchemy.sql import Select, select
 from starlette.endpoints import HTTPEndpoint
 from starlette.requests import Request
 from starlette.authentication import requires
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
+from marshmallow import validate
 from webargs import fields
 from webargs_starlette import use_args
 
-from ....response import response
+from OpenQueue.tables import user_table, statistic_table
+from OpenQueue.models.user import UserModel
+
+from ....response import page_response, error_response
 from ....decorators import required_states
+from ....cursor import KeysetPage
+from ....bulk import bulk_response, BULK_MAX
+
+from .....caching import CacheUser
+from .....resources import Config, Sessions
+
+
+# User columns & the league's statistics of them.
+USER_COLUMNS = [user_table] + [
+    column for column in statistic_table.c if column.name not in user_table.c
+]
+
+
+def users_query(league_id: str) -> Select:
+    """Used to select users of a league.
+
+    Parameters
+    ----------
+    league_id : str
+
+    Returns
+    -------
+    Select
+    """
+
+    return select(USER_COLUMNS).select_from(
+        statistic_table.join(
+            user_table, user_table.c.user_id == statistic_table.c.user_id
+        )
+    ).where(statistic_table.c.league_id == league_id)
 
 
 class LeagueUsersAPI(HTTPEndpoint):
-    @use_args({"search": fields.Str(), "page": fields.Int(),
-               "desc": fields.Bool()})
+    @use_args({"search": fields.Str(), "desc": fields.Bool(),
+               "cursor": fields.Str()})
     @requires("league.users")
     @required_states("league")
-    async def post(self, request: Request, paramters: dict) -> JSONResponse:
+    async def post(self, request: Request, paramters: dict
+                   ) -> Union[JSONResponse, Response]:
         """Lists user for a league.
 
         Parameters
@@ -31,11 +68,67 @@ class LeagueUsersAPI(HTTPEndpoint):
         """
 
         league = request.state.league
-        public_schema = request.state.public_schema["league.matches"]
+        public_schema = request.state.public_schema["league.users"]
+
+        try:
+            # A to Z by name unless desc is given.
+            page = KeysetPage(paramters, Config.api.page_size, desc=False)
+        except ValueError:
+            return error_response("Invalid cursor", status_code=400)
+
+        query = users_query(league.league_id)
+        if page.search:
+            query = query.where(user_table.c.name.ilike(
+                "%" + page.search + "%"
+            ))
 
         data = [
-            player.api_schema(public_schema)
-            async for player, _ in league.players(**paramters)
+            UserModel(**row).api_schema(public_schema)
+            async for row in page.rows(
+                query, user_table.c.name, user_table.c.user_id
+            )
         ]
 
-        return response(data)
+        return page_response(request, data, page.next_cursor())
+
+
+class LeagueUsersBulkAPI(HTTPEndpoint):
+    @use_args({"user_ids": fields.List(
+        fields.String(validate=validate.Length(max=36)),
+        required=True,
+        validate=validate.Length(1, BULK_MAX)
+    )})
+    @requires("league.users")
+    @required_states("league")
+    async def post(self, request: Request, paramters: dict) -> Response:
+        """Used to get many users of a league at once.
+
+        Parameters
+        ----------
+        request : Request
+        paramters : dict
+
+        Returns
+        -------
+        response
+            Users in the order given, null if not found.
+        """
+
+        league = request.state.league
+        public_schema = request.state.public_schema["league.users"]
+
+        async def load(user_ids: List[str]) -> Dict[str, UserModel]:
+            query = users_query(league.league_id).where(
+                statistic_table.c.user_id.in_(user_ids)
+            )
+
+            return {
+                row["user_id"]: UserModel(**row)
+                async for row in Sessions.database.iterate(query)
+            }
+
+        return await bulk_response(
+            [CacheUser(league.league_id, user_id)
+             for user_id in paramters["user_ids"]],
+            paramters["user_ids"], load, public_schema
+        )
@@ -19,7 +19,7 @@ class GenerateLoginToken(HTTPEndpoint):
     @required_states("league")
     async def post(self, request: SkrimRequest) -> JSONResponse:
         return response({
-            "token": Sessions.login_token.generate_login_token(
+            "token": await Sessions.login_token.generate_login_token(
                 request.state.league.league_id
             )
         })
@@ -30,7 +30,7 @@ class UserToken(HTTPEndpoint):
     async def get(self, request: SkrimRequest) -> JSONResponse:
         if "user_token" in request.query_params:
             return response({
-                "user": Sessions.login_token.get_user_id(
+                "user": await Sessions.login_token.get_user_id(
                     request.query_params["user_token"]
                 )
             })
@@ -57,7 +57,7 @@ class LoginRedirect(HTTPEndpoint):
             return RedirectResponse(
                 "{}?user_token={}".format(
                     request.query_params["redirect"],
-                    Sessions.login_token.generate_user_token(
+                    await Sessions.login_token.generate_user_token(
                         request.query_params["league_id"],
                         request.query_params["login_token"],
                         request.session["login"]["identifiers"]["user"]
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+from typing import Any, Awaitable, Callable, Dict, List
+from starlette.responses import Response
+
+from .response import encoded_response
+
+from ..caching import CacheResponse
+from ..encoders import json_dumps
+
+
+# Most IDs a bulk request can give.
+BULK_MAX = 100
+
+
+async def bulk_response(caches: List[CacheResponse], ids: List[str],
+                        load_many: Callable[[List[str]],
+                                            Awaitable[Dict[str, Any]]],
+                        public_schema: bool) -> Response:
+    """Used to send many cached items as one list.
+
+    Parameters
+    ----------
+    caches : List[CacheResponse]
+    ids : List[str]
+        ID of each cache's item.
+    load_many : Callable[[List[str]], Awaitable[Dict[str, Any]]]
+        Used to load models by ID in one query, IDs which
+        don't exist are left out.
+    public_schema : bool
+
+    Returns
+    -------
+    Response
+        Items in the order given, null for ones which don't exist.
+
+    Notes
+    -----
+    Public items are read from the cache in one request, only
+    misses are loaded & in one query. Private items skip the cache.
+    """
+
+    prefix = len(CacheResponse.codec.PREFIX)
+    suffix = len(CacheResponse.codec.SUFFIX)
+
+    def public_loader(item_id: str) -> Callable[[], Awaitable[dict]]:
+        async def load() -> dict:
+            return (await load_many([item_id]))[item_id].api_schema(True)
+
+        return load
+
+    if public_schema:
+        cached = await CacheResponse.get_responses(
+            caches, [public_loader(item_id) for item_id in ids]
+        )
+    else:
+        cached = [None] * len(caches)
+
+    items = [
+        found[1][prefix:-suffix] if found else None for found in cached
+    ]
+
+    missing = {
+        ids[index]: caches[index]
+        for index, item in enumerate(items) if item is None
+    }
+    if missing:
+        loaded = {
+            item_id: model.api_schema(public_schema)
+            for item_id, model in (await load_many(list(missing))).items()
+        }
+
+        for index, item in enumerate(items):
+            if item is None:
+                items[index] = (
+                    json_dumps(loaded[ids[index]]) if ids[index] in loaded
+                    else b"null"
+                )
+
+        if public_schema:
+            # Cached for the single item endpoints too.
+            await asyncio.gather(*[
+                missing[item_id].set(value)
+                for item_id, value in loaded.items()
+            ])
+
+    return encoded_response(
+        b'{"data":[' + b",".join(items) + b'],"error":null}'
+    )
@@ -1,3 +1,11 @@
+import hmac
+import json
+import msgpack
+
+from hashlib import sha256
+from time import time, time_ns
+from typing import Dict, List, Tuple
+
 from starlette.endpoints import HTTPEndpoint
 from starlette.authentication import requires
 from starlette.requests import Request
@@ -6,10 +14,97 @@ from starlette.responses import Response
 from OpenQueue.models.match import MatchModel
 
 from ..caching import (
-    CacheMatches,
     CacheScoreboard,
     CacheMatch
 )
+from ..resources import Config, Sessions
+
+
+# Header holding the hex HMAC-SHA256 of the timestamp, "." & the body.
+SIGNATURE_HEADER = "Webhook-Signature"
+# Header holding the unix time in seconds the batch was signed at.
+TIMESTAMP_HEADER = "Webhook-Timestamp"
+# Seconds either side of now a signed batch is accepted for,
+# less than a cached scoreboard lives so replays are ignored.
+SIGNATURE_WINDOW = 60
+
+MATCH_EVENTS = (141201, 141202, 141203)
+
+
+async def cache_matches(payloads: List[dict], revision: int = None) -> None:
+    """Used to cache match events.
+
+    Parameters
+    ----------
+    payloads : List[dict]
+        Match payloads, oldest first.
+    revision : int, optional
+        Unix time in microseconds the payloads were
+        sent at, by default now
+
+    Notes
+    -----
+    Payloads for the same match are coalesced so only the
+    latest scoreboard is written. Matches with a cached
+    scoreboard as new or newer than revision are skipped.
+    """
+
+    if revision is None:
+        revision = time_ns() // 1000
+
+    latest: Dict[Tuple[str, str], dict] = {}
+    for payload in payloads:
+        key = (payload["league_id"], payload["match_id"])
+        # Re-inserting keeps the dict ordered by latest arrival.
+        latest.pop(key, None)
+        latest[key] = payload
+
+    for (league_id, match_id), payload in latest.items():
+        if not await CacheScoreboard(league_id, match_id).set_newer(
+                payload, revision):
+            continue
+
+        await Sessions.scoreboards.publish(league_id, match_id, payload)
+
+        match_data = MatchModel(**payload).api_schema()
+        await CacheMatch(league_id, match_id).set(match_data)
+
+        await Sessions.match_feed.push(league_id, match_id, match_data)
+
+
+def parse_batch(request: Request, body: bytes) -> List[dict]:
+    """Used to parse a batch of webhook events.
+
+    Parameters
+    ----------
+    request : Request
+    body : bytes
+        NDJSON or a msgpack array.
+
+    Returns
+    -------
+    List[dict]
+
+    Raises
+    ------
+    ValueError
+    """
+
+    content_type = request.headers.get("Content-Type", "")
+    if "msgpack" in content_type:
+        events = msgpack.unpackb(body, raw=False)
+        if not isinstance(events, list):
+            raise ValueError()
+    else:
+        events = [
+            json.loads(line) for line in body.splitlines() if line.strip()
+        ]
+
+    for event in events:
+        if not isinstance(event, dict) or "__wh_event_id" not in event:
+            raise ValueError()
+
+    return events
 
 
 class CachingRoute(HTTPEndpoint):
@@ -23,24 +118,8 @@ class CachingRoute(HTTPEndpoint):
         payload.pop("__wh_event_id")
 
         # League match caching
-        if event_id in (141201, 141202, 141203):
-            match_id = payload["match_id"]
-            league_id = payload["league_id"]
-
-            await CacheScoreboard(league_id, match_id).set(payload)
-
-            match_data = MatchModel(**payload).api_schema()
-            await CacheMatch(league_id, match_id).set(match_data)
-
-            matches_cache = CacheMatches(payload["league_id"])
-
-            current_matches: list = await matches_cache.get()
-            if current_matches:
-                current_matches.insert(0, match_data)
-
-                await matches_cache.set(current_matches)
-            else:
-                await matches_cache.set([match_data])
+        if event_id in MATCH_EVENTS:
+            await cache_matches([payload])
 
         # League caching
         elif event_id in (141207, 141208):
@@ -50,3 +129,64 @@ class CachingRoute(HTTPEndpoint):
             pass
 
         return Response()
+
+
+class CachingBatchRoute(HTTPEndpoint):
+    async def post(self, request: Request) -> Response:
+        """Used to cache a signed batch of webhook events.
+
+        Parameters
+        ----------
+        request : Request
+
+        Returns
+        -------
+        Response
+
+        Notes
+        -----
+        The signature covers the timestamp, so a captured batch
+        can't be sent again outside SIGNATURE_WINDOW, or at all
+        once its matches are cached.
+        """
+
+        if (SIGNATURE_HEADER not in request.headers
+                or TIMESTAMP_HEADER not in request.headers):
+            return Response(status_code=401)
+
+        timestamp = request.headers[TIMESTAMP_HEADER]
+        try:
+            signed_at = int(timestamp)
+        except ValueError:
+            return Response(status_code=401)
+
+        if abs(time() - signed_at) > SIGNATURE_WINDOW:
+            return Response(status_code=401)
+
+        body = await request.body()
+
+        signature = hmac.new(
+            Config.webhooks.key.encode(), timestamp.encode() + b"." + body,
+            sha256
+        ).hexdigest().encode()
+        if not hmac.compare_digest(
+                signature, request.headers[SIGNATURE_HEADER].lower().encode()):
+            return Response(status_code=401)
+
+        try:
+            events = parse_batch(request, body)
+        except ValueError:
+            return Response(status_code=400)
+
+        matches = []
+        for event in events:
+            event_id = event.pop("__wh_event_id")
+
+            # League match caching
+            if event_id in MATCH_EVENTS:
+                matches.append(event)
+
+        if matches:
+            await cache_matches(matches, signed_at * 1000000)
+
+        return Response()
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+"""
+Opaque cursors given as next_cursor, clients send
+them back to get the next page.
+"""
+
+import msgpack
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Mapping, Tuple, Union
+
+from sqlalchemy import Column
+from sqlalchemy.sql import Select, tuple_
+
+from ..resources import Sessions
+
+
+# Cursor kinds.
+FEED = "f"
+KEYSET = "k"
+
+# msgpack ext type datetimes are packed as.
+DATETIME_EXT = 1
+
+
+def _pack(value: Any) -> msgpack.ExtType:
+    if isinstance(value, datetime):
+        return msgpack.ExtType(DATETIME_EXT, value.isoformat().encode())
+
+    raise TypeError()
+
+
+def _unpack(code: int, data: bytes) -> Any:
+    if code == DATETIME_EXT:
+        return datetime.fromisoformat(data.decode())
+
+    return msgpack.ExtType(code, data)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Used to encode a cursor.
+
+    Returns
+    -------
+    str
+    """
+
+    return urlsafe_b64encode(
+        msgpack.packb(values, use_bin_type=True, default=_pack)
+    ).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Used to decode a cursor.
+
+    Parameters
+    ----------
+    cursor : str
+
+    Returns
+    -------
+    List[Any]
+
+    Raises
+    ------
+    ValueError
+    """
+
+    try:
+        values = msgpack.unpackb(
+            urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)),
+            raw=False, ext_hook=_unpack
+        )
+    except Exception:
+        raise ValueError()
+
+    if not isinstance(values, list) or not values:
+        raise ValueError()
+
+    return values
+
+
+def feed_cursor(score: float, match_id: str) -> str:
+    return encode_cursor(FEED, score, match_id)
+
+
+def decode_feed_cursor(cursor: str) -> Tuple[float, str]:
+    """Used to get the position of the last match seen in the feed.
+
+    Parameters
+    ----------
+    cursor : str
+
+    Returns
+    -------
+    float
+        Score.
+    str
+        Match ID.
+
+    Raises
+    ------
+    ValueError
+    """
+
+    values = decode_cursor(cursor)
+    if (len(values) != 3 or values[0] != FEED
+            or not isinstance(values[1], (int, float))
+            or not isinstance(values[2], str)):
+        raise ValueError()
+
+    return float(values[1]), values[2]
+
+
+class KeysetPage:
+    def __init__(self, paramters: dict, size: int,
+                 desc: bool = True) -> None:
+        """Used to read a page of rows after the (sort key, ID)
+        of the last row the client saw.
+
+        Parameters
+        ----------
+        paramters : dict
+            search, desc & cursor, a cursor holds the search &
+            desc of the page it came from, given ones must match.
+        size : int
+            Rows per page.
+        desc : bool, optional
+            Order when desc isn't given, by default True
+
+        Raises
+        ------
+        ValueError
+            If the cursor isn't valid or is for other filters.
+
+        Notes
+        -----
+        Reading a page costs the same however deep it is,
+        rows added or removed don't shift later pages.
+        """
+
+        self.search: Union[str, None] = paramters.get("search")
+        self.desc: bool = paramters.get("desc", desc)
+        self.after: Union[Tuple[Any, str], None] = None
+
+        if "cursor" in paramters:
+            values = decode_cursor(paramters["cursor"])
+            if (len(values) != 5 or values[0] != KEYSET
+                    or not isinstance(values[1], (str, type(None)))
+                    or not isinstance(values[2], bool)
+                    or not isinstance(values[3], (int, float, str, datetime))
+                    or not isinstance(values[4], str)):
+                raise ValueError()
+
+            _, search, desc, *after = values
+            if (paramters.get("search", search) != search
+                    or paramters.get("desc", desc) != desc):
+                raise ValueError()
+
+            self.search, self.desc = search, desc
+            self.after = tuple(after)
+
+        self.size = size
+
+        self.read = 0
+        self.last: Union[Tuple[Any, str], None] = None
+
+    async def rows(self, query: Select, sort_key: Column, id_column: Column
+                   ) -> AsyncIterator[Mapping]:
+        """Used to read the page's rows.
+
+        Parameters
+        ----------
+        query : Select
+            Selecting sort_key & id_column.
+        sort_key : Column
+        id_column : Column
+            Breaks ties between equal sort keys.
+
+        Yields
+        ------
+        Mapping
+        """
+
+        if self.after:
+            position = tuple_(sort_key, id_column)
+            query = query.where(
+                position < tuple_(*self.after) if self.desc
+                else position > tuple_(*self.after)
+            )
+
+        if self.desc:
+            query = query.order_by(sort_key.desc(), id_column.desc())
+        else:
+            query = query.order_by(sort_key.asc(), id_column.asc())
+
+        async for row in Sessions.database.iterate(query.limit(self.size)):
+            self.read += 1
+            self.last = (row[sort_key.name], row[id_column.name])
+
+            yield row
+
+    def next_cursor(self) -> Union[str, None]:
+        """Used to get the cursor for the next page once read.
+
+        Returns
+        -------
+        Union[str, None]
+            None if the page wasn't full.
+        """
+
+        if self.read < self.size:
+            return None
+
+        return encode_cursor(KEYSET, self.search, self.desc, *self.last)
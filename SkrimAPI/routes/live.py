@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+from typing import AsyncIterator
+from starlette.authentication import has_required_scope
+from starlette.responses import StreamingResponse
+from starlette.websockets import WebSocket
+
+from ..resources import Sessions
+
+
+# Seconds between keep alive comments on quiet streams.
+HEARTBEAT = 15
+
+
+async def _event_stream(league_id: str, match_id: str = None
+                        ) -> AsyncIterator[bytes]:
+    async for event in Sessions.scoreboards.subscribe(
+            league_id, match_id, HEARTBEAT):
+        yield event[1] if event else b": heartbeat\n\n"
+
+
+def live_response(league_id: str, match_id: str = None
+                  ) -> StreamingResponse:
+    """Used to stream scoreboards as server sent events.
+
+    Parameters
+    ----------
+    league_id : str
+    match_id : str, optional
+        Every match in the league if not given, by default None
+
+    Returns
+    -------
+    StreamingResponse
+    """
+
+    return StreamingResponse(
+        _event_stream(league_id, match_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def live_socket(websocket: WebSocket) -> None:
+    """Used to send scoreboards over a websocket, given league
+    gets every match in the league, given match only that match.
+
+    Parameters
+    ----------
+    websocket : WebSocket
+    """
+
+    if "match" in websocket.query_params:
+        scope = "league.match.scoreboard"
+    else:
+        scope = "league.matches"
+
+    if not has_required_scope(websocket, [scope]):
+        await websocket.close()
+        return
+
+    # States not given raise AttributeError.
+    try:
+        if "match" in websocket.query_params:
+            match = websocket.state.match
+            league_id, match_id = match.upper.league_id, match.match_id
+        else:
+            league_id, match_id = websocket.state.league.league_id, None
+    except AttributeError:
+        await websocket.close()
+        return
+
+    await websocket.accept()
+
+    async def send_events() -> None:
+        async for event in Sessions.scoreboards.subscribe(
+                league_id, match_id):
+            await websocket.send_text(event[0])
+
+    sending = asyncio.ensure_future(send_events())
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        sending.cancel()
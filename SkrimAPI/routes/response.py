@@ -1,12 +1,181 @@
 # -*- coding: utf-8 -*-
 
-from typing import Any
-from starlette.responses import JSONResponse
+from hashlib import blake2b
+from typing import Any, Callable, List, Union
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from ..encoders import json_dumps
+
+
+# Bytes of hash in a body's ETag, same as cached responses.
+ETAG_SIZE = 8
+
+
+# Swap to change how every response is encoded, read on
+# each call so it's never bound as a method.
+encoder: Callable[[Any], bytes] = json_dumps
+
+
+class SkrimJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return encoder(content)
 
 
 def response(data: Any = {}, *args, **kwargs) -> JSONResponse:
-    return JSONResponse({"data": data, "error": None}, *args, **kwargs)
+    return SkrimJSONResponse({"data": data, "error": None}, *args, **kwargs)
+
+
+def encoded_response(body: bytes, *args, **kwargs) -> Response:
+    """Used to send a already encoded response body.
+
+    Parameters
+    ----------
+    body : bytes
+
+    Returns
+    -------
+    Response
+    """
+
+    return Response(body, *args, media_type="application/json", **kwargs)
+
+
+def page_response(request: Request, data: List[Any],
+                  next_cursor: Union[str, None]) -> Response:
+    """Used to send a page, with the cursor for the next one.
+
+    Parameters
+    ----------
+    request : Request
+    data : List[Any]
+    next_cursor : Union[str, None]
+        None if this is the last page.
+
+    Returns
+    -------
+    Response
+    """
+
+    return encoded_page_response(
+        request, [encoder(item) for item in data], next_cursor
+    )
+
+
+def encoded_page_response(request: Request, items: List[bytes],
+                          next_cursor: Union[str, None]) -> Response:
+    """Used to send a page of already encoded items,
+    or 304 if the client has it.
+
+    Parameters
+    ----------
+    request : Request
+    items : List[bytes]
+    next_cursor : Union[str, None]
+        None if this is the last page.
+
+    Returns
+    -------
+    Response
+
+    Notes
+    -----
+    The ETag is a hash of the body, so it only
+    changes when the page's items do.
+    """
+
+    body = (
+        b'{"data":[' + b",".join(items) + b'],"error":null,"next_cursor":'
+        + json_dumps(next_cursor) + b"}"
+    )
+
+    return cached_response(
+        request,
+        '"' + blake2b(body, digest_size=ETAG_SIZE).hexdigest() + '"',
+        body
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Used to check If-None-Match against a ETag.
+
+    Parameters
+    ----------
+    request : Request
+    etag : str
+
+    Returns
+    -------
+    bool
+    """
+
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag[:2] == "W/":
+            tag = tag[2:]
+
+        if tag == etag:
+            return True
+
+    return False
+
+
+def precondition_response(request: Request, etag: str
+                          ) -> Union[JSONResponse, None]:
+    """Used to check If-Match against the current ETag.
+
+    Parameters
+    ----------
+    request : Request
+    etag : str
+        Current strong ETag.
+
+    Returns
+    -------
+    Union[JSONResponse, None]
+        428 if If-Match wasn't given, 412 with the current
+        ETag if it doesn't match, None if it matches.
+    """
+
+    if_match = request.headers.get("If-Match")
+    if not if_match:
+        return error_response("If-Match required", status_code=428)
+
+    if if_match.strip() != "*" and etag not in (
+            tag.strip() for tag in if_match.split(",")):
+        return error_response(
+            "Scoreboard changed", status_code=412, headers={"ETag": etag}
+        )
+
+    return None
+
+
+def cached_response(request: Request, etag: str, body: bytes) -> Response:
+    """Used to send a cached body, or 304 if the client has it.
+
+    Parameters
+    ----------
+    request : Request
+    etag : str
+    body : bytes
+
+    Returns
+    -------
+    Response
+    """
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return encoded_response(body, headers={"ETag": etag})
 
 
 def error_response(error: Any = {}, *args, **kwargs) -> JSONResponse:
-    return JSONResponse({"data": None, "error": error}, *args, **kwargs)
+    return SkrimJSONResponse({"data": None, "error": error}, *args, **kwargs)
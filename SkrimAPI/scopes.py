@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, Mapping, Tuple
+from sqlalchemy.sql import select
+from databases import Database
+from starlette.authentication import AuthCredentials
+
+from .tables import scopes_table
+
+
+logger = logging.getLogger("SkrimAPI")
+
+# Resolved scopes, granted names & scope to if public schema.
+Resolved = Tuple[FrozenSet[str], Mapping[str, bool]]
+
+
+class ScopeCredentials(AuthCredentials):
+    def __init__(self, scopes: FrozenSet[str]) -> None:
+        """Keeps the given frozenset, so @requires
+        checks are set lookups instead of list scans.
+
+        Parameters
+        ----------
+        scopes : FrozenSet[str]
+        """
+
+        self.scopes = scopes
+
+
+def to_mask(scope_ids: Iterable[int]) -> int:
+    """Used to turn scope IDs into a bitmask.
+
+    Parameters
+    ----------
+    scope_ids : Iterable[int]
+
+    Returns
+    -------
+    int
+        Bit scope ID set for each scope.
+    """
+
+    mask = 0
+    for scope_id in scope_ids:
+        mask |= 1 << scope_id
+
+    return mask
+
+
+class ScopeRegistry:
+    def __init__(self, database: Database) -> None:
+        """In memory copy of the scopes table, turns
+        scope bitmasks into shared scope sets.
+
+        Parameters
+        ----------
+        database : Database
+
+        Notes
+        -----
+        Masks use the scope ID as the bit, so they stay
+        valid between reloads & workers.
+        """
+
+        self.database = database
+
+        self.scopes: Dict[int, str] = {}
+        self.known = 0
+        self.resolved: Dict[Tuple[int, int], Resolved] = {}
+
+        self.loading: asyncio.Future = None
+
+    async def load(self) -> None:
+        """Used to load the scopes table, reloads only
+        drop resolved sets if the table changed.
+        """
+
+        query = select([scopes_table.c.scope_id, scopes_table.c.scope])
+
+        scopes = {
+            row["scope_id"]: row["scope"]
+            async for row in self.database.iterate(query)
+        }
+
+        if scopes != self.scopes:
+            self.scopes = scopes
+            self.known = to_mask(scopes.keys())
+            self.resolved = {}
+
+    async def reload(self) -> None:
+        """Used to load the scopes table, calls made
+        while loading wait on the same load.
+        """
+
+        if self.loading is None:
+            self.loading = asyncio.ensure_future(self.load())
+            self.loading.add_done_callback(self._loaded)
+
+        await asyncio.shield(self.loading)
+
+    def _loaded(self, future: asyncio.Future) -> None:
+        self.loading = None
+
+    async def poll(self, interval: int) -> None:
+        """Used to reload the scopes table every interval.
+
+        Parameters
+        ----------
+        interval : int
+            Seconds between reloads.
+        """
+
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception("Reloading scopes failed")
+
+    async def resolve(self, granted: int, public: int) -> Resolved:
+        """Used to get scope names & public schema for masks,
+        reloads first if a scope isn't known yet.
+
+        Parameters
+        ----------
+        granted : int
+            Mask of granted scopes.
+        public : int
+            Mask of scopes using the public schema.
+
+        Returns
+        -------
+        FrozenSet[str]
+            Granted scopes.
+        Mapping[str, bool]
+            Read only, scope to if public schema.
+        """
+
+        if (granted, public) in self.resolved:
+            return self.resolved[(granted, public)]
+
+        if granted & ~self.known:
+            await self.reload()
+
+        public_schema = {
+            scope: bool(public >> scope_id & 1)
+            for scope_id, scope in self.scopes.items()
+            if granted >> scope_id & 1
+        }
+        if "league" not in public_schema:
+            public_schema["league"] = True
+
+        resolved = (
+            frozenset(public_schema.keys()),
+            MappingProxyType(public_schema)
+        )
+        self.resolved[(granted, public)] = resolved
+
+        return resolved
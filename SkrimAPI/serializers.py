@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+import msgpack
+
+from hashlib import blake2b
+from time import time_ns
+from typing import Any, Tuple, Union
+from aiocache.serializers import BaseSerializer
+
+from OpenQueue.league import League
+
+from .resources import Sessions
+from .encoders import json_dumps, json_loads
+
+
+class BytesSerializer(BaseSerializer):
+    """Passes values through untouched, codecs
+    handle turning values into bytes.
+    """
+
+    DEFAULT_ENCODING = None
+
+    def dumps(self, value: bytes) -> bytes:
+        return value
+
+    def loads(self, value: bytes) -> bytes:
+        return value
+
+
+class CodecBase:
+    """Used to turn cached values into versioned bytes.
+
+    Notes
+    -----
+    The first byte is the codec version, bump it
+    whenever the stored format changes.
+    """
+
+    version: int
+
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError()
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError()
+
+    def encode(self, value: Any) -> bytes:
+        return bytes((self.version,)) + self.dumps(value)
+
+    def decode(self, raw: bytes) -> Any:
+        """Used to decode stored bytes.
+
+        Parameters
+        ----------
+        raw : bytes
+
+        Returns
+        -------
+        Any
+            None if stored by another codec version.
+        """
+
+        if not raw or raw[0] != self.version:
+            return None
+
+        return self.loads(raw[1:])
+
+
+class MsgpackCodec(CodecBase):
+    version = 1
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+class APIKeyCodec(MsgpackCodec):
+    """Stores the league ID instead of the league object,
+    scope masks as bytes as they can be over 64 bits.
+    """
+
+    version = 5
+
+    def dumps(self, value: Union[Tuple[League, str, int, int], bool]
+              ) -> bytes:
+        if value is False:
+            return super().dumps(False)
+
+        league, user_id, granted, public = value
+        return super().dumps((
+            league.league_id, user_id,
+            granted.to_bytes((granted.bit_length() + 7) // 8, "big"),
+            public.to_bytes((public.bit_length() + 7) // 8, "big")
+        ))
+
+    def loads(self, data: bytes
+              ) -> Union[Tuple[League, str, int, int], bool]:
+        value = super().loads(data)
+        if value is False:
+            return False
+
+        league_id, user_id, granted, public = value
+        return (
+            Sessions.base.league(league_id), user_id,
+            int.from_bytes(granted, "big"), int.from_bytes(public, "big")
+        )
+
+
+class ResponseCodec(CodecBase):
+    """Stores the full JSON response body, so hits
+    can be sent without encoding them again.
+
+    Notes
+    -----
+    Stored as version, ETag hash then body.
+    """
+
+    version = 4
+
+    PREFIX = b'{"data":'
+    SUFFIX = b',"error":null}'
+
+    ETAG_SIZE = 8
+
+    def dumps(self, value: Any) -> bytes:
+        body = self.PREFIX + json_dumps(value) + self.SUFFIX
+        return blake2b(body, digest_size=self.ETAG_SIZE).digest() + body
+
+    def loads(self, data: bytes) -> Any:
+        return json_loads(data[self.ETAG_SIZE:])["data"]
+
+    def response(self, raw: bytes) -> Union[Tuple[str, bytes], None]:
+        """Used to get the ETag & response body from stored bytes.
+
+        Parameters
+        ----------
+        raw : bytes
+
+        Returns
+        -------
+        str
+            Strong ETag.
+        bytes
+            Response body.
+        None
+            If stored by another codec version.
+        """
+
+        if not raw or raw[0] != self.version:
+            return None
+
+        return (
+            '"' + raw[1:self.ETAG_SIZE + 1].hex() + '"',
+            raw[self.ETAG_SIZE + 1:]
+        )
+
+
+class RevisionedResponseCodec(ResponseCodec):
+    """ResponseCodec with a revision in place of the ETag hash,
+    so a body changed back to how it was still gets a new ETag.
+
+    Notes
+    -----
+    Stored as version, revision then body. Bodies stored without
+    a revision are given the time in microseconds, revisions
+    only go up, even after a entry expires & is loaded again.
+    """
+
+    version = 5
+
+    def dumps(self, value: Any) -> bytes:
+        return self.dumps_revision(value, time_ns() // 1000)
+
+    def dumps_revision(self, value: Any, revision: int) -> bytes:
+        return (revision.to_bytes(self.ETAG_SIZE, "big") + self.PREFIX
+                + json_dumps(value) + self.SUFFIX)
+
+    def encode_revision(self, value: Any, revision: int) -> bytes:
+        return bytes((self.version,)) + self.dumps_revision(value, revision)
+
+    def revision(self, etag: str) -> Union[int, None]:
+        """Used to get the revision a ETag is for.
+
+        Parameters
+        ----------
+        etag : str
+
+        Returns
+        -------
+        Union[int, None]
+            None if not a ETag this codec gave.
+        """
+
+        try:
+            return int.from_bytes(bytes.fromhex(etag[1:-1]), "big")
+        except ValueError:
+            return None
+
+    def etag(self, revision: int) -> str:
+        return '"' + revision.to_bytes(self.ETAG_SIZE, "big").hex() + '"'
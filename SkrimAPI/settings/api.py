@@ -5,7 +5,9 @@ from typing import List
 
 class ApiSettings:
     def __init__(self, root_users: List[str] = [],
-                 league_scope: str = "league.") -> None:
+                 league_scope: str = "league.",
+                 scopes_reload: int = 300,
+                 page_size: int = 25) -> None:
         """Scope leagues are allowed to assign.
 
         Parameters
@@ -14,7 +16,14 @@ class ApiSettings:
             NL user ID, by default []
         league_scope : str, optional
             by default "league."
+        scopes_reload : int, optional
+            Seconds between scopes table reloads, keys given
+            a unknown scope also cause a reload, by default 300
+        page_size : int, optional
+            Rows per page of league users & matches, by default 25
         """
 
         self.root_users = root_users
         self.league_scope = league_scope
+        self.scopes_reload = scopes_reload
+        self.page_size = page_size
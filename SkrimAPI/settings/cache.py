@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict
+
+
+class LocalCacheSettings:
+    def __init__(self, max_size: int = 1024, ttl: int = 5) -> None:
+        """In process cache for one cache class.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            Max entries held, by default 1024
+        ttl : int, optional
+            Seconds a entry is trusted for, by default 5
+        """
+
+        self.max_size = max_size
+        self.ttl = ttl
+
+
+class CacheSettings:
+    def __init__(self, local: Dict[str, LocalCacheSettings] = None,
+                 invalidate_channel: str = "skrim-cache-invalidate",
+                 scoreboard_channel: str = "skrim-scoreboards",
+                 match_feed_size: int = 500,
+                 match_feed_page: int = 25,
+                 token_store_size: int = 100000) -> None:
+        """Configure caching.
+
+        Parameters
+        ----------
+        local : Dict[str, LocalCacheSettings], optional
+            Cache class name to settings, classes not given
+            only use the shared cache, by default None
+        invalidate_channel : str, optional
+            by default "skrim-cache-invalidate"
+        scoreboard_channel : str, optional
+            Scoreboards for live subscribers are published
+            to, by default "skrim-scoreboards"
+        match_feed_size : int, optional
+            Matches kept per league, by default 500
+        match_feed_page : int, optional
+            Matches per page read from the feed, by default 25
+        token_store_size : int, optional
+            Login tokens held by the memory store, redis
+            isn't capped, by default 100000
+        """
+
+        if local is None:
+            local = {
+                "CacheMatch": LocalCacheSettings(),
+                "CacheScoreboard": LocalCacheSettings(),
+                "CacheUser": LocalCacheSettings(),
+                "CacheAPIKey": LocalCacheSettings(max_size=4096, ttl=30),
+                "CacheAdminScopes": LocalCacheSettings(),
+                "CacheSession": LocalCacheSettings(max_size=4096)
+            }
+
+        self.local = local
+        self.invalidate_channel = invalidate_channel
+        self.scoreboard_channel = scoreboard_channel
+        self.match_feed_size = match_feed_size
+        self.match_feed_page = match_feed_page
+        self.token_store_size = token_store_size
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+from typing import List
+
+
+class MatchmakingSettings:
+    def __init__(self, maps: List[str] = None,
+                 tick_interval: float = 1.0, tick_budget: float = 0.05,
+                 team_1_name: str = "Team 1", team_2_name: str = "Team 2",
+                 connection_time: int = 300, knife_round: bool = False,
+                 wait_for_spectators: bool = False,
+                 warmup_time: int = 15, max_failures: int = 3) -> None:
+        """Configure matches formed from full queues, each
+        queue's capacity is the players per match.
+
+        Parameters
+        ----------
+        maps : List[str], optional
+            Picked from at random, matchmaking
+            is off if not given, by default None
+        tick_interval : float, optional
+            Seconds between queue scans, by default 1.0
+        tick_budget : float, optional
+            Seconds a scan can spend popping lobbies, the
+            rest are left for the next tick, by default 0.05
+        team_1_name : str, optional
+            by default "Team 1"
+        team_2_name : str, optional
+            by default "Team 2"
+        connection_time : int, optional
+            by default 300
+        knife_round : bool, optional
+            by default False
+        wait_for_spectators : bool, optional
+            by default False
+        warmup_time : int, optional
+            by default 15
+        max_failures : int, optional
+            Times a player's lobby can fail to become a match
+            before they're removed from the queue, by default 3
+        """
+
+        self.maps = maps
+        self.tick_interval = tick_interval
+        self.tick_budget = tick_budget
+        self.team_1_name = team_1_name
+        self.team_2_name = team_2_name
+        self.connection_time = connection_time
+        self.knife_round = knife_round
+        self.wait_for_spectators = wait_for_spectators
+        self.warmup_time = warmup_time
+        self.max_failures = max_failures
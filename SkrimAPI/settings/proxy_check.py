@@ -4,7 +4,10 @@
 class ProxyCheckSettings:
     def __init__(self, dev_mode: bool,
                  key: str = None, allow_vpns: bool = False,
-                 allow_alts: bool = False) -> None:
+                 allow_alts: bool = False, cache_size: int = 4096,
+                 cache_ttl: int = 3600, batch_size: int = 100,
+                 batch_wait: float = 0.01, ip_ranges: str = None,
+                 stub: bool = False) -> None:
         """Configure proxy check.
 
         Parameters
@@ -16,9 +19,28 @@ class ProxyCheckSettings:
             by default False
         allow_alts : bool, optional
             by default False
+        cache_size : int, optional
+            IPs kept in memory, by default 4096
+        cache_ttl : int, optional
+            by default 3600
+        batch_size : int, optional
+            Max IPs per proxycheck.io request, by default 100
+        batch_wait : float, optional
+            Seconds lookups wait to be batched, by default 0.01
+        ip_ranges : str, optional
+            Path to a IP range table checked before
+            proxycheck.io, by default None
+        stub : bool, optional
+            Uses a local stub instead of proxycheck.io, by default False
         """
 
         self.dev_mode = dev_mode
         self.key = key
         self.allow_vpns = allow_vpns
         self.allow_alts = allow_alts
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.ip_ranges = ip_ranges
+        self.stub = stub
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+from heapq import heappop, heappush
+from time import monotonic
+from typing import Dict, List, Tuple, Union
+from aiocache import Cache
+
+
+class TokenStoreBase:
+    """Used to hold short lived tokens.
+    """
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        raise NotImplementedError()
+
+    async def pop(self, key: str) -> Union[str, None]:
+        """Used to get & delete a token at once.
+
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        Union[str, None]
+            None if missing or expired.
+        """
+
+        raise NotImplementedError()
+
+
+class MemoryTokenStore(TokenStoreBase):
+    def __init__(self, max_size: int = 100000) -> None:
+        """In process store, used with the memory cache & for testing.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            Tokens held before the closest to
+            expiring are dropped, by default 100000
+        """
+
+        self.max_size = max_size
+
+        self.tokens: Dict[str, Tuple[float, str]] = {}
+        # (expires, key), entries for popped keys are skipped.
+        self.expiry: List[Tuple[float, str]] = []
+
+    def _purge(self, now: float) -> None:
+        while self.expiry and (
+                self.expiry[0][0] <= now
+                or len(self.tokens) > self.max_size):
+            expires, key = heappop(self.expiry)
+            if key in self.tokens and self.tokens[key][0] == expires:
+                del self.tokens[key]
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        now = monotonic()
+
+        self.tokens[key] = (now + ttl, value)
+        heappush(self.expiry, (now + ttl, key))
+
+        self._purge(now)
+
+    async def pop(self, key: str) -> Union[str, None]:
+        if key not in self.tokens:
+            return None
+
+        expires, value = self.tokens.pop(key)
+        if expires <= monotonic():
+            return None
+
+        return value
+
+
+class RedisTokenStore(TokenStoreBase):
+    # KEYS: token
+    POP_SCRIPT = """
+        local value = redis.call('GET', KEYS[1])
+        if value then
+            redis.call('DEL', KEYS[1])
+        end
+        return value
+    """
+
+    def __init__(self, cache: Cache) -> None:
+        """Store shared by every worker, redis expires tokens.
+
+        Parameters
+        ----------
+        cache : Cache
+            Redis cache.
+        """
+
+        self.cache = cache
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await self.cache.raw("set", "token-" + key, value, expire=ttl)
+
+    async def pop(self, key: str) -> Union[str, None]:
+        # The pool decodes replies as utf-8.
+        return await self.cache.raw(
+            "eval", self.POP_SCRIPT, ["token-" + key], []
+        )
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compares balancing a tournament pool into lobbies player by
+player (before) against balancing every lobby at once (after).
+
+python -m benchmarks.balancing
+"""
+
+import numpy as np
+
+from time import perf_counter
+
+from SkrimAPI.balancing import balance
+
+
+PLAYERS = 5000
+TEAM_SIZE = 5
+
+
+def before(ratings: np.ndarray) -> np.ndarray:
+    """Each lobby alone, each player to the team with less rating.
+    """
+
+    lobby_size = TEAM_SIZE * 2
+    order = sorted(range(len(ratings)), key=lambda index: -ratings[index])
+
+    differences = []
+    for start in range(0, len(order) - lobby_size + 1, lobby_size):
+        sums = [0.0, 0.0]
+        sizes = [0, 0]
+        for index in order[start:start + lobby_size]:
+            if sizes[1] == TEAM_SIZE or (
+                    sums[0] <= sums[1] and sizes[0] < TEAM_SIZE):
+                team = 0
+            else:
+                team = 1
+            sums[team] += ratings[index]
+            sizes[team] += 1
+
+        differences.append(abs(sums[0] - sums[1]) / TEAM_SIZE)
+
+    return np.array(differences)
+
+
+def after(ratings: np.ndarray) -> np.ndarray:
+    return balance(ratings, TEAM_SIZE)[2]
+
+
+def main() -> None:
+    ratings = np.random.default_rng(0).normal(1000, 200, PLAYERS)
+    listed = ratings.tolist()
+
+    print("{:<10}{:>12}{:>18}{:>16}".format(
+        "path", "time (ms)", "mean difference", "max difference"
+    ))
+
+    for path, call, given in (("before", before, listed),
+                              ("after", after, ratings)):
+        started = perf_counter()
+        differences = call(given)
+        taken = perf_counter() - started
+
+        print("{:<10}{:>12.2f}{:>18.3f}{:>16.3f}".format(
+            path, taken * 1e3, differences.mean(), differences.max()
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compares the middleware's per request state & scope work for a logged
+in user viewing a league match, before (built eagerly, scope lists)
+& after (precomputed scope sets, states built into a plain dict).
+
+python -m benchmarks.middleware
+"""
+
+from timeit import timeit
+
+from starlette.authentication import AuthCredentials
+from starlette.datastructures import QueryParams
+
+from SkrimAPI.resources import Sessions
+from SkrimAPI.scopes import ScopeCredentials
+from SkrimAPI.middleware import league_states, site_league_all_scopes
+
+
+NUMBER = 100000
+
+USER_ID = "d5bf2ef0-3a4e-4b3c-9a9a-1c0d6b0e5f01"
+
+# Parsed once per request by starlette either way.
+QUERY_PARAMS = QueryParams("league=skrim&user={}&match=1".format(USER_ID))
+
+
+class Handle:
+    """Stands in for OpenQueue's league, user & match
+    objects, which only hold IDs till used.
+    """
+
+    def __init__(self, *ids: str) -> None:
+        self.ids = ids
+
+    def league(self, league_id: str) -> "Handle":
+        return Handle(*self.ids, league_id)
+
+    def user(self, user_id: str) -> "Handle":
+        return Handle(*self.ids, user_id)
+
+    def match(self, match_id: str) -> "Handle":
+        return Handle(*self.ids, match_id)
+
+
+def before() -> AuthCredentials:
+    query_params = QUERY_PARAMS
+    state = {}
+
+    scopes = ["site", "site.loggedIn"]
+    public_schema = {}
+
+    scopes += ["league", "league.matches", "league.users"]
+    public_schema["league.matches"] = True
+    state["league"] = Sessions.base.league(query_params["league"])
+    public_schema["league"] = True
+
+    scopes += ["league.user", "league.user.matches"]
+    public_schema["league.user.matches"] = True
+    if query_params["user"] == USER_ID:
+        scopes.append("league.user.owner")
+        public_schema["league.user"] = False
+        public_schema["league.user.owner"] = False
+    state["user"] = state["league"].user(query_params["user"])
+
+    scopes += ["league.match", "league.match.scoreboard"]
+    public_schema["league.match"] = True
+    public_schema["league.match.scoreboard"] = True
+    state["match"] = state["league"].match(query_params["match"])
+
+    state["public_schema"] = public_schema
+    return AuthCredentials(scopes)
+
+
+def after() -> ScopeCredentials:
+    query_params = QUERY_PARAMS
+
+    league_id = query_params["league"]
+    target_user = query_params.get("user")
+    ban_id = query_params.get("ban")
+    match_id = query_params.get("match")
+
+    scopes, public_schema = site_league_all_scopes(
+        False,
+        league_id in (),
+        target_user is not None,
+        target_user == USER_ID,
+        target_user is not None and ban_id is not None,
+        match_id is not None
+    )
+
+    state = league_states(
+        Sessions.base.league(league_id), target_user, ban_id, match_id
+    )
+    state["public_schema"] = public_schema
+
+    return ScopeCredentials(scopes)
+
+
+def main() -> None:
+    Sessions.base = Handle()
+
+    print("{:<10}{:>14}".format("path", "per call (us)"))
+
+    for path, call in (("before", before), ("after", after)):
+        print("{:<10}{:>14.2f}".format(
+            path, timeit(call, number=NUMBER) / NUMBER * 1e6
+        ))
+
+
+if __name__ == "__main__":
+    main()
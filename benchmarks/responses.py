@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compares building cache hit responses for the match & scoreboard
+endpoints, before (decode, then JSONResponse) & after (stored body).
+
+python -m benchmarks.responses
+"""
+
+from timeit import timeit
+
+from aiocache.serializers import JsonSerializer
+from starlette.responses import JSONResponse
+
+from SkrimAPI.serializers import ResponseCodec
+from SkrimAPI.routes.response import response, encoded_response
+
+from .serialization import scoreboard
+
+
+NUMBER = 10000
+
+
+def main() -> None:
+    json = JsonSerializer()
+    codec = ResponseCodec()
+
+    data = scoreboard()
+    match = {key: value for key, value in data.items() if key != "players"}
+
+    print("{:<14}{:<24}{:>14}".format("endpoint", "path", "per call (us)"))
+
+    for name, value in (("match", match), ("scoreboard", data)):
+        stored = json.dumps(value)
+        raw = codec.encode(value)
+
+        paths = {
+            "before hit": lambda: JSONResponse(
+                {"data": json.loads(stored), "error": None}
+            ),
+            "after hit": lambda: encoded_response(codec.response(raw)[1]),
+            "after miss (encoder)": lambda: response(value)
+        }
+
+        for path, call in paths.items():
+            print("{:<14}{:<24}{:>14.2f}".format(
+                name, path, timeit(call, number=NUMBER) / NUMBER * 1e6
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compares bytes stored & encode/decode time of cached values
+between aiocache's serializers and our codecs.
+
+python -m benchmarks.serialization
+"""
+
+from timeit import timeit
+from typing import Any, Callable, Dict, Tuple
+from uuid import uuid4
+
+from aiocache.serializers import JsonSerializer, PickleSerializer
+
+from SkrimAPI.serializers import MsgpackCodec
+
+
+NUMBER = 10000
+
+
+def scoreboard() -> dict:
+    return {
+        "match_id": str(uuid4()),
+        "league_id": "skrim",
+        "team_1_score": 12,
+        "team_2_score": 9,
+        "team_1_side": 0,
+        "team_2_side": 1,
+        "team_1_name": "Team 1",
+        "team_2_name": "Team 2",
+        "status": 1,
+        "map": "de_mirage",
+        "players": [{
+            "name": "Player {}".format(index),
+            "user_id": str(uuid4()),
+            "team": index % 2,
+            "alive": True,
+            "ping": 32,
+            "kills": 18,
+            "headshots": 9,
+            "assists": 4,
+            "deaths": 12,
+            "shots_fired": 412,
+            "shots_hit": 120,
+            "mvps": 3,
+            "score": 44,
+            "disconnected": False,
+            "team_blinds": 1,
+            "team_kills": 0
+        } for index in range(10)]
+    }
+
+
+def matches() -> list:
+    return [{
+        key: value for key, value in scoreboard().items()
+        if key != "players"
+    } for _ in range(200)]
+
+
+def formats() -> Dict[str, Tuple[Callable[[Any], bytes],
+                                 Callable[[bytes], Any]]]:
+    json = JsonSerializer()
+    pickle = PickleSerializer()
+    codec = MsgpackCodec()
+
+    return {
+        "json": (lambda value: json.dumps(value).encode(),
+                 lambda raw: json.loads(raw.decode())),
+        "pickle": (pickle.dumps, pickle.loads),
+        "msgpack codec": (codec.encode, codec.decode)
+    }
+
+
+def main() -> None:
+    print("{:<14}{:<15}{:>10}{:>14}{:>14}".format(
+        "value", "format", "bytes", "encode (us)", "decode (us)"
+    ))
+
+    for name, value in (("scoreboard", scoreboard()),
+                        ("matches", matches())):
+        for format_name, (dumps, loads) in formats().items():
+            raw = dumps(value)
+
+            encode = timeit(lambda: dumps(value), number=NUMBER)
+            decode = timeit(lambda: loads(raw), number=NUMBER)
+
+            print("{:<14}{:<15}{:>10}{:>14.2f}{:>14.2f}".format(
+                name, format_name, len(raw),
+                encode / NUMBER * 1e6, decode / NUMBER * 1e6
+            ))
+
+
+if __name__ == "__main__":
+    main()